@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+bench_logging.py
+
+Per-task overhead of the reactor; with logging at WARNING vs DEBUG.
+
+Debug messages (including pretty printed results) are only formatted when
+somebody is listening; at WARNING, the overhead should be that of the reactor
+alone.
+
+Usage: python benchmarks/bench_logging.py [<nb of tasks>]
+"""
+from __future__ import print_function
+
+import logging
+import sys
+import time
+
+from pyreactor.reactor import Reactor
+
+logger = logging.getLogger('pyreactor')
+
+
+def make_record(x):
+    """
+    Sample action. Return a largish result; costly to pretty print.
+
+    :param x: the task
+    :type x: int
+    :return: a record
+    :rtype: dict
+    """
+    return {'task': x, 'values': list(range(50)), 'labels': ['label'] * 20}
+
+
+def bench(nb_tasks, level):
+    """
+    Time a run of nb_tasks tasks with the pyreactor logger at level.
+
+    :param nb_tasks: how many tasks
+    :type nb_tasks: int
+    :param level: logging level
+    :type level: int
+    :return: per-task wall clock time (secs)
+    :rtype: float
+    """
+    logger.setLevel(level)
+    _reactor = Reactor(stop_on_error=False, parallelism=4)
+
+    _start_time = time.time()
+    _reactor.run(tasks=range(nb_tasks), action=make_record, chunksize=100)
+    return (time.time() - _start_time) / nb_tasks
+
+
+def main():
+    _nb_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    for _level in (logging.WARNING, logging.DEBUG):
+        _per_task = bench(_nb_tasks, _level)
+        print('{:<8} {:>8.1f} usecs/task'.format(logging.getLevelName(_level),
+                                                 _per_task * 1e6))
+
+
+if __name__ == '__main__':
+    main()
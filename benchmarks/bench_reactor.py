@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+bench_reactor.py
+
+Benchmark suite for the reactor; results are written as JSON so that runs can
+be compared.
+
+Benchmarks:
+  - throughput: tasks/sec for no-op actions.
+  - first_result: time to the first result of a stream.
+  - startup: cost of spawning workers; one no-op task per worker.
+  - abort: time for a stop-on-error reactor to give up on a run once a task
+    has failed.
+  - payload: results of growing sizes; pickled through the pipes, or parked in
+    shared memory.
+
+Each case runs in a fresh process; so that its record carries the memory
+high-water marks (of the master and of its workers) of that case alone.
+
+Usage: python benchmarks/bench_reactor.py [--quick] [--output <path>]
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import pyreactor
+from pyreactor.reactor import Reactor, SharedMemoryTransport
+
+
+def noop(x):
+    """
+    Sample action. Do nothing.
+
+    :param x: the task
+    :type x: int
+    :return: the task
+    :rtype: int
+    """
+    return x
+
+
+def fail_first(x):
+    """
+    Sample action. Fail on the first task; take a while on the others.
+
+    :param x: the task
+    :type x: int
+    :return: the task
+    :rtype: int
+    """
+    if x == 0:
+        raise ValueError('failing on purpose')
+    time.sleep(0.01)
+    return x
+
+
+def make_payload(x):
+    """
+    Sample action. Return a string of x bytes.
+
+    :param x: the task; the size of the payload
+    :type x: int
+    :return: the payload
+    :rtype: bytes
+    """
+    return b'x' * x
+
+
+def high_water_marks():
+    """
+    Memory high-water marks of the process so far; of the case it runs.
+
+    :return: max resident set sizes of the master and of its workers (KB)
+    :rtype: dict
+    """
+    return {
+        'maxrss_master_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'maxrss_workers_kb': resource.getrusage(
+            resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def bench_throughput(parallelism, nb_tasks, stop_on_error):
+    """
+    Time a run of nb_tasks no-op tasks.
+
+    :return: duration (secs) and tasks/sec
+    :rtype: dict
+    """
+    _reactor = Reactor(stop_on_error=stop_on_error, parallelism=parallelism)
+
+    _start_time = time.time()
+    _reactor.run(tasks=range(nb_tasks), action=noop, chunksize='auto')
+    _duration = time.time() - _start_time
+
+    return {'duration': _duration, 'tasks_per_sec': nb_tasks / _duration}
+
+
+def bench_first_result(parallelism, nb_tasks, stop_on_error):
+    """
+    Time a stream of nb_tasks no-op tasks up to its first result.
+
+    :return: time to first result and duration (secs)
+    :rtype: dict
+    """
+    _reactor = Reactor(stop_on_error=stop_on_error, parallelism=parallelism)
+
+    _start_time = time.time()
+    _results = _reactor.stream(tasks=range(nb_tasks), action=noop)
+    next(_results)
+    _first_result = time.time() - _start_time
+    for _ in _results:
+        pass
+
+    return {'first_result': _first_result,
+            'duration': time.time() - _start_time}
+
+
+def bench_startup(parallelism, stop_on_error):
+    """
+    Time a run of a single no-op task per worker.
+
+    :return: duration and duration per worker (secs)
+    :rtype: dict
+    """
+    _reactor = Reactor(stop_on_error=stop_on_error, parallelism=parallelism)
+
+    _start_time = time.time()
+    _reactor.run(tasks=range(parallelism), action=noop)
+    _duration = time.time() - _start_time
+
+    return {'duration': _duration, 'per_worker': _duration / parallelism}
+
+
+def bench_abort(parallelism, nb_tasks):
+    """
+    Time a stop-on-error run whose first task fails.
+
+    :return: time until the run is given up (secs)
+    :rtype: dict
+    """
+    _reactor = Reactor(stop_on_error=True, parallelism=parallelism)
+
+    _start_time = time.time()
+    try:
+        _reactor.run(tasks=range(nb_tasks), action=fail_first)
+    except pyreactor.Error:
+        pass
+
+    # the run would take nb_tasks / parallelism * 0.01 secs if it went on.
+    return {'abort_latency': time.time() - _start_time}
+
+
+def bench_payload(parallelism, size, nb_tasks, shared_memory):
+    """
+    Time a run of nb_tasks tasks with results of size bytes.
+
+    :return: duration (secs) and MB/sec of results
+    :rtype: dict
+    """
+    _transport = SharedMemoryTransport(threshold=0) if shared_memory else None
+    _reactor = Reactor(stop_on_error=True, parallelism=parallelism,
+                       transport=_transport)
+
+    _start_time = time.time()
+    _reactor.run(tasks=[size] * nb_tasks, action=make_payload)
+    _duration = time.time() - _start_time
+
+    return {'duration': _duration,
+            'mb_per_sec': size * nb_tasks / _duration / 2 ** 20}
+
+
+BENCHMARKS = {
+    'throughput': bench_throughput,
+    'first_result': bench_first_result,
+    'startup': bench_startup,
+    'abort': bench_abort,
+    'payload': bench_payload,
+}
+
+
+def run_case(benchmark, params):
+    """
+    Run a benchmark case in a fresh process.
+
+    :param benchmark: name of the benchmark
+    :type benchmark: str
+    :param params: its parameters
+    :type params: dict
+    :return: its metrics; high-water marks included
+    :rtype: dict
+    """
+    _output = subprocess.check_output(
+        [sys.executable, __file__, '--case',
+         json.dumps([benchmark, params])])
+
+    return json.loads(_output.decode('utf-8'))
+
+
+def sweep(quick):
+    """
+    Every benchmark over its sweep of parameters.
+
+    :param quick: whether to run smaller sweeps
+    :type quick: bool
+    :return: iterator over (<benchmark>, <params>)
+    :rtype: generator
+    """
+    _parallelisms = (1, 4) if quick else (1, 2, 4, 8)
+    _task_counts = (1000,) if quick else (1000, 10000, 100000)
+    _sizes = (2 ** 10, 2 ** 20) if quick else (2 ** 10, 2 ** 16, 2 ** 20,
+                                               2 ** 23)
+
+    for _parallelism in _parallelisms:
+        for _stop_on_error in (False, True):
+            _params = {'parallelism': _parallelism,
+                       'stop_on_error': _stop_on_error}
+
+            for _nb_tasks in _task_counts:
+                yield ('throughput', dict(_params, nb_tasks=_nb_tasks))
+
+            yield ('first_result', dict(_params, nb_tasks=_task_counts[-1]))
+
+            yield ('startup', _params)
+
+        yield ('abort', {'parallelism': _parallelism, 'nb_tasks': 1000})
+
+        for _size in _sizes:
+            for _shared_memory in (False, True):
+                yield ('payload', {'parallelism': _parallelism, 'size': _size,
+                                   'nb_tasks': 20,
+                                   'shared_memory': _shared_memory})
+
+
+def main():
+    _parser = argparse.ArgumentParser(description='Benchmark the reactor.')
+    _parser.add_argument('--quick', action='store_true',
+                         help='run smaller sweeps')
+    _parser.add_argument('--output', default=None,
+                         help='where to write the JSON results; stdout '
+                              'by default')
+    _parser.add_argument('--case', default=None, help=argparse.SUPPRESS)
+    _args = _parser.parse_args()
+
+    if _args.case:
+        # a single case; in a process of its own (see run_case).
+        (_benchmark, _params) = json.loads(_args.case)
+        _metrics = BENCHMARKS[_benchmark](**_params)
+        json.dump(dict(_metrics, **high_water_marks()), sys.stdout)
+        return
+
+    _report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': multiprocessing.cpu_count(),
+            'pyreactor': '.'.join(str(i) for i in pyreactor.__version__),
+            'quick': _args.quick,
+        },
+        'results': [],
+    }
+
+    for (_benchmark, _params) in sweep(_args.quick):
+        _metrics = run_case(_benchmark, _params)
+        _record = {'benchmark': _benchmark, 'params': _params,
+                   'metrics': _metrics}
+        _report['results'].append(_record)
+        sys.stderr.write('{} {} {}\n'.format(_benchmark, _params, _metrics))
+
+    if _args.output:
+        with open(_args.output, 'w') as _file:
+            json.dump(_report, _file, indent=2, sort_keys=True)
+    else:
+        json.dump(_report, sys.stdout, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -32,3 +32,9 @@ class Error(Exception):
         if not message:
             log_msg = 'Generic exception message for pyreactor project.'
             self.message = log_msg
+
+
+class TaskTimeout(Error):
+    """
+    An action ran out of time; see Reactor.task_timeout.
+    """
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+async_reactor.py
+
+The reactor pattern on an asyncio event loop; for coroutine actions.
+  - Requires asyncio (Python 3.4+); importable (but unusable) without it.
+"""
+import functools
+import logging
+import traceback
+
+try:
+    import asyncio
+except ImportError:
+    # Python 2
+    asyncio = None
+
+from pyreactor import Error
+
+__all__ = ['AsyncReactor']
+
+# Initialize logging.
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class AsyncReactor(object):
+    """
+    Runs coroutine actions (eg. `async def` functions) concurrently on an event
+    loop; with the API and error behaviour of Reactor.run.
+
+    :var.parallelism: most actions running at once by default.
+
+                        - Tasks are taken off the iterable of tasks as room
+                          frees up; so that at most parallelism actions are
+                          outstanding at any time.
+
+    :var.correlate_tasks_to_results: whether we correlate tasks to results
+
+                                        - If True, provide list of tuple::
+
+                                                [(<task>, <result>),
+                                                (<task>, <result>)]
+
+                                        - Else provide list of result's::
+
+                                                [<result>, <result>]
+
+    :var.ordered: whether results are provided in order of tasks
+
+                        - Else results are provided in order of completion.
+
+    """
+    # most actions running at once by default
+    parallelism = 1000
+
+    # whether we correlate tasks to results
+    correlate_tasks_to_results = False
+
+    # whether results are provided in order of tasks
+    ordered = False
+
+    def __init__(self, stop_on_error, parallelism=parallelism):
+        """
+        Initializer.
+
+        :param stop_on_error: cancel all outstanding actions if there is an
+                              exception in any one of them.
+        :type stop_on_error: bool
+        :param parallelism: most actions running at once.
+        :type parallelism: int
+        :return: None
+        :rtype: None
+        """
+        if asyncio is None:
+            raise Error('AsyncReactor requires asyncio (Python 3.4+).')
+
+        if parallelism < 1:
+            raise Error('parallelism must be a positive int.')
+
+        self.stop_on_error = stop_on_error
+        self.parallelism = parallelism
+
+        # the tasks that the user has entrusted us with
+        self.tasks = None
+
+        # results to be returned to the caller
+        self.final_results = []
+
+        # error by any of the actions
+        self.error = None
+
+    def run(self, tasks, action,
+            correlate_tasks_to_results=correlate_tasks_to_results,
+            ordered=ordered):
+        """
+        Carry out the action on every task; on an event loop of its own.
+          - Blocks until done; not to be called from a running event loop (see
+            run_async).
+
+        :param tasks: data points
+        :type tasks: iterable of objects
+        :param action: the action to be done using task data points; returns
+                       an awaitable (eg. an `async def` function).
+        :type action: callable
+        :param correlate_tasks_to_results: whether we correlate tasks to results
+        :type correlate_tasks_to_results: bool
+        :param ordered: whether results are provided in order of tasks
+        :type ordered: bool
+        :return: results of the action
+        :rtype: list
+        """
+        _loop = asyncio.new_event_loop()
+        # actions may well look up the current event loop.
+        asyncio.set_event_loop(_loop)
+        try:
+            return _loop.run_until_complete(
+                self.run_async(tasks, action, correlate_tasks_to_results,
+                               ordered, loop=_loop))
+        finally:
+            asyncio.set_event_loop(None)
+            _loop.close()
+
+    def run_async(self, tasks, action,
+                  correlate_tasks_to_results=correlate_tasks_to_results,
+                  ordered=ordered, loop=None):
+        """
+        Carry out the action on every task; on a running event loop.
+
+        :param tasks: data points
+        :type tasks: iterable of objects
+        :param action: the action to be done using task data points; returns
+                       an awaitable (eg. an `async def` function).
+        :type action: callable
+        :param correlate_tasks_to_results: whether we correlate tasks to results
+        :type correlate_tasks_to_results: bool
+        :param ordered: whether results are provided in order of tasks
+        :type ordered: bool
+        :param loop: the event loop; the running one by default.
+        :type loop: asyncio.AbstractEventLoop
+        :return: a future of the results of the action; raises Error in
+                 stop-on-error mode if any action fails.
+        :rtype: asyncio.Future
+        """
+        if loop is None:
+            loop = asyncio.get_event_loop()
+
+        self.correlate_tasks_to_results = correlate_tasks_to_results
+        self.ordered = ordered
+
+        # a clean slate for this run.
+        self.tasks = tasks
+        self.final_results = []
+        self.error = None
+
+        return _Run(self, iter(tasks), action, loop).future
+
+
+class _Run(object):
+    """
+    A run of an AsyncReactor; launches actions as room frees up and gathers
+    their results in completion callbacks.
+    """
+
+    def __init__(self, reactor, tasks, action, loop):
+        """
+        Initializer; launches the first actions.
+
+        :param reactor: the reactor
+        :type reactor: AsyncReactor
+        :param tasks: iterator over tasks
+        :type tasks: iterator
+        :param action: the action
+        :type action: callable
+        :param loop: the event loop
+        :type loop: asyncio.AbstractEventLoop
+        :return: None
+        :rtype: None
+        """
+        self.__reactor = reactor
+        self.__tasks = tasks
+        self.__action = action
+        self.__loop = loop
+
+        # outstanding actions
+        self.__running = set()
+
+        # results by index of task; when ordered
+        self.__results = {}
+
+        # nb of tasks taken so far
+        self.__nb_tasks = 0
+
+        # set once there are no more tasks to take; or no point in taking
+        # any more
+        self.__exhausted = False
+
+        # error while iterating over the tasks
+        self.__feed_error = None
+
+        # the results of the run; to be awaited
+        self.future = loop.create_future()
+
+        self.__launch()
+
+    def __launch(self):
+        """
+        Launch actions on tasks; as long as there is room for them.
+
+        :return: None
+        :rtype: None
+        """
+        _reactor = self.__reactor
+
+        while (not self.__exhausted and
+               len(self.__running) < _reactor.parallelism):
+            try:
+                _task = next(self.__tasks)
+            except StopIteration:
+                self.__exhausted = True
+                break
+            except Exception as e:
+                # the tasks could not all be taken; the results are
+                # incomplete.
+                self.__feed_error = self.__format(e)
+                self.__exhausted = True
+
+                log_msg = 'Failed to iterate over tasks: {}'.format(
+                    self.__feed_error)
+                logger.error(log_msg)
+                break
+
+            _index = self.__nb_tasks
+            self.__nb_tasks += 1
+
+            try:
+                _future = asyncio.ensure_future(self.__action(_task),
+                                                loop=self.__loop)
+            except Exception as e:
+                # not even an awaitable; an error of the task all the same.
+                _future = self.__loop.create_future()
+                _future.set_exception(e)
+
+            _future.add_done_callback(
+                functools.partial(self.__finish, _index, _task))
+            self.__running.add(_future)
+
+        if self.__exhausted and not self.__running:
+            self.__wrap_up()
+
+    def __finish(self, index, task, future):
+        """
+        Gather the result of an action; and launch more in its place.
+
+        :param index: index of the task
+        :type index: int
+        :param task: the task
+        :type task: object
+        :param future: the (done) action
+        :type future: asyncio.Future
+        :return: None
+        :rtype: None
+        """
+        _reactor = self.__reactor
+        self.__running.discard(future)
+
+        if future.cancelled():
+            # cancelled on a stop; nothing to gather.
+            _result = None
+            _moot = True
+        elif future.exception() is not None:
+            _error = self.__format(future.exception())
+
+            log_msg = 'Task {} has had an exception. '.format(index)
+            log_msg += 'Exception details: {}'.format(future.exception())
+            logger.error(log_msg)
+
+            if _reactor.stop_on_error and _reactor.error is None:
+                self.__stop(_error)
+
+            _result = None
+            _moot = _reactor.stop_on_error
+        else:
+            _result = future.result()
+            _moot = _reactor.error is not None and _reactor.stop_on_error
+
+        if not _moot:
+            if _reactor.correlate_tasks_to_results:
+                _result = (task, _result)
+
+            if _reactor.ordered:
+                self.__results[index] = _result
+            else:
+                _reactor.final_results.append(_result)
+
+        self.__launch()
+
+    def __stop(self, error):
+        """
+        Record an error and cancel all outstanding actions right away.
+
+        :param error: error info (traceback)
+        :type error: str
+        :return: None
+        :rtype: None
+        """
+        self.__reactor.error = error
+
+        log_msg = 'Cancelling {} outstanding actions.'.format(
+            len(self.__running))
+        logger.warning(log_msg)
+
+        self.__exhausted = True
+        for _future in list(self.__running):
+            _future.cancel()
+
+    def __wrap_up(self):
+        """
+        Settle the results of the run.
+
+        :return: None
+        :rtype: None
+        """
+        _reactor = self.__reactor
+
+        if _reactor.ordered:
+            _reactor.final_results = [self.__results.get(i) for i in
+                                      range(self.__nb_tasks)]
+
+        if self.__feed_error:
+            _reactor.error = self.__feed_error
+            self.future.set_exception(Error(_reactor.error))
+        elif _reactor.error and _reactor.stop_on_error:
+            self.future.set_exception(Error(_reactor.error))
+        else:
+            self.future.set_result(_reactor.final_results)
+
+    @staticmethod
+    def __format(e):
+        """
+        :param e: an exception
+        :type e: Exception
+        :return: its traceback
+        :rtype: str
+        """
+        return ''.join(traceback.format_exception(type(e), e,
+                                                  e.__traceback__))
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+cache.py
+
+Remembers results of actions on tasks; across runs, and reactors.
+"""
+import collections
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    # Python 3
+    import pickle
+
+__all__ = ['ResultCache', 'LRUCache', 'DiskCache', 'canonical']
+
+# Initialize logging.
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class _Items(tuple):
+    """
+    The items of a dict; in canonical order (see canonical).
+    """
+
+
+class _Members(tuple):
+    """
+    The members of a set or a frozenset; in canonical order (see canonical).
+    """
+
+
+def _pickled(obj):
+    """
+    :param obj: an object
+    :type obj: object
+    :return: its pickle
+    :rtype: bytes
+    """
+    return pickle.dumps(obj, 2)
+
+
+def canonical(obj):
+    """
+    A form of an object that pickles the same as any object equal to it.
+      - Dicts, sets and frozensets pickle in an order of their own otherwise;
+        the order items were inserted in, or (eg. for str) one that varies
+        with PYTHONHASHSEED across processes. Their items are sorted by their
+        pickles; in lists and tuples, at any depth.
+      - Other objects are as is; eg. a dict attribute of an instance is not
+        canonical.
+
+    :param obj: an object
+    :type obj: object
+    :return: its canonical form
+    :rtype: object
+    """
+    if type(obj) in (list, tuple):
+        return type(obj)(canonical(_item) for _item in obj)
+
+    if type(obj) is dict:
+        return _Items(sorted(((canonical(_key), canonical(_value))
+                              for (_key, _value) in obj.items()),
+                             key=lambda _item: _pickled(_item[0])))
+
+    if type(obj) in (set, frozenset):
+        return _Members(sorted((canonical(_member) for _member in obj),
+                               key=_pickled))
+
+    return obj
+
+
+class ResultCache(object):
+    """
+    Remembers results of actions on tasks; across runs, and reactors. Tasks
+    whose results are remembered are answered by the master; they are never
+    fed to the workers.
+
+    :var.ttl: how long a result is remembered (secs); None for ever
+    :var.hits: nb of lookups that found a result
+    :var.misses: nb of lookups that did not
+
+    Results are keyed by a stable hash of the action and the task; see key.
+    Results of tasks that failed are not remembered.
+
+    A cache stores (<result>, <time stored>) entries by key; subclasses provide
+    lookup, store and discard. get and set are safe to call from several
+    threads of the master.
+    """
+    # how long a result is remembered (secs); None for ever
+    ttl = None
+
+    def __init__(self, ttl=ttl):
+        """
+        Initializer.
+
+        :param ttl: how long a result is remembered (secs); None for ever.
+        :type ttl: float
+        :return: None
+        :rtype: None
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # the feeder looks results up while the master stores them.
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(action, task):
+        """
+        A stable hash of the action and the task; of their pickles.
+          - The action is pickled by reference (eg. its module and name); a
+            lambda or a closure has no key, and nor has a task that cannot be
+            pickled. Their results are not remembered.
+          - The task is pickled in its canonical form (see canonical); so
+            that equal dicts and sets have the same key.
+
+        :param action: the action
+        :type action: callable
+        :param task: the task
+        :type task: object
+        :return: the key; or None
+        :rtype: str
+        """
+        try:
+            _pickle = pickle.dumps((action, canonical(task)), 2)
+        except Exception:
+            return None
+
+        return hashlib.sha1(_pickle).hexdigest()
+
+    def get(self, key):
+        """
+        Look a result up; an expired one is discarded.
+
+        :param key: the key
+        :type key: str
+        :return: (<whether found>, <result>)
+        :rtype: tuple
+        """
+        with self.__lock:
+            _entry = self.lookup(key)
+
+            if (_entry is not None and self.ttl is not None and
+                    time.time() - _entry[1] > self.ttl):
+                self.discard(key)
+                _entry = None
+
+            if _entry is None:
+                self.misses += 1
+                return (False, None)
+
+            self.hits += 1
+            return (True, _entry[0])
+
+    def set(self, key, result):
+        """
+        Remember a result.
+
+        :param key: the key
+        :type key: str
+        :param result: the result
+        :type result: object
+        :return: None
+        :rtype: None
+        """
+        with self.__lock:
+            self.store(key, (result, time.time()))
+
+    def lookup(self, key):
+        """
+        :param key: the key
+        :type key: str
+        :return: (<result>, <time stored>); or None
+        :rtype: tuple
+        """
+        raise NotImplementedError
+
+    def store(self, key, entry):
+        """
+        :param key: the key
+        :type key: str
+        :param entry: (<result>, <time stored>)
+        :type entry: tuple
+        :return: None
+        :rtype: None
+        """
+        raise NotImplementedError
+
+    def discard(self, key):
+        """
+        :param key: the key
+        :type key: str
+        :return: None
+        :rtype: None
+        """
+        raise NotImplementedError
+
+    def sync(self):
+        """
+        Make stored results durable; called by the reactor after every run.
+
+        :return: None
+        :rtype: None
+        """
+        pass
+
+    def close(self):
+        """
+        Let go of resources; the cache is not to be used thereafter.
+
+        :return: None
+        :rtype: None
+        """
+        pass
+
+
+class LRUCache(ResultCache):
+    """
+    Remembers results in memory; the least recently used ones make room for
+    new ones.
+
+    :var.maxsize: most results remembered
+
+    Results are handed out as is; not copies of them.
+    """
+    # most results remembered
+    maxsize = 1024
+
+    def __init__(self, maxsize=maxsize, ttl=ResultCache.ttl):
+        """
+        Initializer.
+
+        :param maxsize: most results remembered.
+        :type maxsize: int
+        :param ttl: how long a result is remembered (secs); None for ever.
+        :type ttl: float
+        :return: None
+        :rtype: None
+        """
+        super(LRUCache, self).__init__(ttl=ttl)
+        self.maxsize = maxsize
+
+        # entries; least recently used first
+        self.__entries = collections.OrderedDict()
+
+    def lookup(self, key):
+        _entry = self.__entries.pop(key, None)
+        if _entry is not None:
+            # most recently used now
+            self.__entries[key] = _entry
+        return _entry
+
+    def store(self, key, entry):
+        self.__entries.pop(key, None)
+        self.__entries[key] = entry
+
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+    def discard(self, key):
+        self.__entries.pop(key, None)
+
+
+class DiskCache(ResultCache):
+    """
+    Remembers results in a sqlite database on disk; across processes.
+
+    :var.batch: nb of results stored between commits
+
+    Results are pickled; a result that cannot be pickled is not remembered.
+    Results stored since the last commit are committed after every run (see
+    sync); and when the cache is closed.
+    """
+    # nb of results stored between commits
+    batch = 1000
+
+    def __init__(self, path, ttl=ResultCache.ttl, batch=batch):
+        """
+        Initializer.
+
+        :param path: the database file; created if need be.
+        :type path: str
+        :param ttl: how long a result is remembered (secs); None for ever.
+        :type ttl: float
+        :param batch: nb of results stored between commits.
+        :type batch: int
+        :return: None
+        :rtype: None
+        """
+        super(DiskCache, self).__init__(ttl=ttl)
+        self.path = path
+        self.batch = batch
+
+        # used by the feeder and the master in turn; under the lock.
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.execute('CREATE TABLE IF NOT EXISTS results '
+                          '(key TEXT PRIMARY KEY, result BLOB, '
+                          'stored_at REAL)')
+        self.__db.commit()
+
+        # nb of results stored since the last commit
+        self.__nb_uncommitted = 0
+
+    def lookup(self, key):
+        _row = self.__db.execute('SELECT result, stored_at FROM results '
+                                 'WHERE key = ?', (key,)).fetchone()
+        if _row is None:
+            return None
+
+        return (pickle.loads(bytes(_row[0])), _row[1])
+
+    def store(self, key, entry):
+        try:
+            _pickle = pickle.dumps(entry[0], 2)
+        except Exception as e:
+            log_msg = 'Not caching a result that cannot be pickled: '
+            log_msg += '{}'.format(e)
+            logger.debug(log_msg)
+            return
+
+        self.__db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                          (key, sqlite3.Binary(_pickle), entry[1]))
+
+        self.__nb_uncommitted += 1
+        if self.__nb_uncommitted >= self.batch:
+            self.__commit()
+
+    def discard(self, key):
+        self.__db.execute('DELETE FROM results WHERE key = ?', (key,))
+
+    def sync(self):
+        self.__commit()
+
+    def close(self):
+        self.__commit()
+        self.__db.close()
+
+    def __commit(self):
+        """
+        :return: None
+        :rtype: None
+        """
+        self.__db.commit()
+        self.__nb_uncommitted = 0
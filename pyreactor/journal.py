@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+journal.py
+
+Checkpoints runs; so that they resume where they left off.
+"""
+import hashlib
+import logging
+import os
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    # Python 3
+    import pickle
+
+from pyreactor.cache import canonical
+
+__all__ = ['Journal']
+
+# Initialize logging.
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def _name(action):
+    """
+    The name of an action; its module and qualified name (eg.
+    ('inventory', 'Poller.poll')). A callable with no name of its own (eg. a
+    partial) is named by its pickle if it has one; else by its type.
+
+    :param action: the action
+    :type action: callable
+    :return: its name
+    :rtype: tuple or bytes
+    """
+    _qualname = (getattr(action, '__qualname__', None) or
+                 getattr(action, '__name__', None))
+    if _qualname is not None:
+        return (getattr(action, '__module__', None), _qualname)
+
+    try:
+        return pickle.dumps(action, 2)
+    except Exception:
+        return (type(action).__module__, type(action).__name__)
+
+
+class Journal(object):
+    """
+    Checkpoints a run; an append-only file of the results of its tasks, by
+    index of task. A run over the same tasks with the same journal resumes
+    where it left off; tasks whose results were journaled are not acted upon
+    again.
+      - Results are journaled along with the key of their task (see key); a
+        journaled result is only handed out for the very task (and action) it
+        was journaled for. Tasks that have changed since are acted upon
+        again.
+
+    :var.path: the journal file
+    :var.batch: nb of results held back before being written in one go
+    :var.interval: most time results are held back (secs); as long as results
+                   keep coming
+    :var.results: (<key>, <result>) journaled by previous runs and yet to be
+                  handed out; by index of task
+
+    Results are written in pickled batches; a batch cut short by a crash is
+    dropped, along with whatever follows it. Results of tasks that failed (or
+    cannot be pickled, or whose task has no key) are not journaled; they are
+    acted upon again on resume.
+    """
+    # nb of results held back before being written in one go
+    batch = 1000
+
+    # most time results are held back (secs)
+    interval = 1.0
+
+    def __init__(self, path, batch=batch, interval=interval):
+        """
+        Initializer.
+
+        :param path: the journal file; created if need be.
+        :type path: str
+        :param batch: nb of results held back before being written in one go.
+        :type batch: int
+        :param interval: most time results are held back (secs).
+        :type interval: float
+        :return: None
+        :rtype: None
+        """
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self.results = {}
+
+        # the journal file; open for appending during a run
+        self.__file = None
+
+        # [(<index of task>, <key>, <result>)] held back
+        self.__held = []
+
+        # when results were last written (secs since epoch)
+        self.__written_at = 0.0
+
+    @staticmethod
+    def key(action, task):
+        """
+        A stable hash of the name of the action and the task.
+          - Unlike ResultCache.key, the action need not be picklable (eg. a
+            lambda or a closure, with the thread backend); it is named by its
+            module and qualified name. Two lambdas of the same function share
+            a name.
+          - The task is pickled in its canonical form (see canonical); a task
+            that cannot be pickled has no key.
+
+        :param action: the action
+        :type action: callable
+        :param task: the task
+        :type task: object
+        :return: the key; or None
+        :rtype: str
+        """
+        try:
+            _pickle = pickle.dumps((_name(action), canonical(task)), 2)
+        except Exception:
+            return None
+
+        return hashlib.sha1(_pickle).hexdigest()
+
+    def open(self):
+        """
+        Read the results journaled by previous runs; and open the journal for
+        appending.
+
+        :return: None
+        :rtype: None
+        """
+        self.results = {}
+        _end = 0
+
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as _file:
+                while True:
+                    try:
+                        for (_index, _key, _result) in pickle.load(_file):
+                            self.results[_index] = (_key, _result)
+                    except EOFError:
+                        break
+                    except Exception as e:
+                        log_msg = 'Dropping the tail of journal {} from byte '
+                        log_msg += '{}; cut short: {}'
+                        logger.warning(log_msg.format(self.path, _end, e))
+                        break
+                    _end = _file.tell()
+
+        self.__file = open(self.path, 'ab')
+        # appended batches must follow the last whole one.
+        self.__file.truncate(_end)
+        self.__held = []
+        self.__written_at = time.time()
+
+    def record(self, indices, keys, results, failed):
+        """
+        Journal the results of a chunk; but those of tasks that failed or
+        have no key.
+          - Held back until batch results are held or interval secs passed.
+
+        :param indices: indices of the tasks of the chunk
+        :type indices: list
+        :param keys: keys of the tasks of the chunk; see key
+        :type keys: list
+        :param results: results of the chunk
+        :type results: list
+        :param failed: positions of the tasks of the chunk that failed
+        :type failed: list
+        :return: None
+        :rtype: None
+        """
+        for (j, (_index, _key, _result)) in enumerate(zip(indices, keys,
+                                                          results)):
+            if _key is not None and j not in failed:
+                self.__held.append((_index, _key, _result))
+
+        if (len(self.__held) >= self.batch or
+                time.time() - self.__written_at > self.interval):
+            self.flush()
+
+    def flush(self):
+        """
+        Write the results held back; in one go.
+
+        :return: None
+        :rtype: None
+        """
+        self.__written_at = time.time()
+        if not self.__held:
+            return
+
+        try:
+            _batch = pickle.dumps(self.__held, 2)
+        except Exception:
+            # some result cannot be pickled; leave it out.
+            _held = []
+            for _record in self.__held:
+                try:
+                    pickle.dumps(_record, 2)
+                except Exception:
+                    continue
+                _held.append(_record)
+            _batch = pickle.dumps(_held, 2)
+        self.__held = []
+
+        self.__file.write(_batch)
+        self.__file.flush()
+
+    def close(self):
+        """
+        Write the results held back; and close the journal file.
+
+        :return: None
+        :rtype: None
+        """
+        if self.__file is None:
+            return
+
+        self.flush()
+        self.__file.close()
+        self.__file = None
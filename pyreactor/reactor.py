@@ -3,33 +3,149 @@
 a multiprocessing reactor
 """
 
-import Queue
+import atexit
+import collections
+import copy
+import functools
+import heapq
+import itertools
 import logging
+import mmap
 import multiprocessing
+# registers its exit handler (joining workers) on import; ahead of ours.
+import multiprocessing.util
+import numbers
 import pprint
 import os
+import select
+import shutil
+import signal
 import sys
+import tempfile
+import threading
 import time
 import traceback
 
-from pyreactor import Error
-
-__all__ = ['Reactor']
+try:
+    import Queue
+except ImportError:
+    # Python 3
+    import queue as Queue
+
+try:
+    import cPickle as pickle
+except ImportError:
+    # Python 3
+    import pickle
+
+try:
+    import asyncio
+except ImportError:
+    # Python 2
+    asyncio = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pyreactor import Error, TaskTimeout
+from pyreactor.journal import Journal
+
+try:
+    basestring
+except NameError:
+    # Python 3
+    basestring = str
+
+__all__ = ['Reactor', 'Stats', 'Timing', 'ProcessBackend', 'ThreadBackend',
+           'SharedMemoryTransport', 'Segment']
 
 # Initialize logging.
 logger = logging.getLogger(name=__name__)
 logger.addHandler(logging.NullHandler())
 
+# kinds of messages on the channel of a worker.
+_RESULTS = 'results'
+_ERROR = 'error'
+_DONE = 'done'
+_RECYCLED = 'recycled'
+_PARTIAL = 'partial'
+
+# persistent reactors not closed yet; their workers wait on their inboxes,
+# and would keep the interpreter from exiting.
+_open_reactors = set()
+
+
+def _close_open_reactors():
+    """
+    Close the persistent reactors left open; at exit.
+      - Exit handlers run last in, first out; so this one runs ahead of that
+        of multiprocessing, which joins the workers.
+
+    :return: None
+    :rtype: None
+    """
+    for _reactor in list(_open_reactors):
+        _reactor.close()
+
+
+atexit.register(_close_open_reactors)
+
+
+def cpu_count():
+    """
+    Nb of CPUs the current process may run on.
+      - Honours the CPU affinity of the process; where it is known.
+
+    :return: nb of CPUs
+    :rtype: int
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
 
 class Reactor(object):
     """
     Leverages multiprocessing to carry out concurrent tasks.
 
-    :var.parallelism: nb of workers by default.
+    :var.parallelism: nb of workers by default; or 'auto' for one per CPU.
     :var.result_timeout: time to wait for result of a task (secs)
 
                             - recommended to be the max time it might take for a
                               task to complete
+                            - the master gives up on workers that stay silent
+                              for longer than that.
+    :var.poll_interval: time between checks on the liveness of workers (secs)
+    :var.grace_period: time given to actions in flight on a stop signal before
+                       their workers are terminated (secs); or None
+
+                            - None lets actions in flight run to completion.
+                            - Workers that outlive their termination by as
+                              long again are killed.
+                            - A persistent pool that had workers terminated is
+                              replaced by a fresh one on the next run.
+                            - Only with the 'process' backend.
+    :var.task_timeout: time an action may take (secs); or None
+
+                            - An action that runs out of time is an error of
+                              its task; its result is None.
+                            - A worker whose action ran out of time makes way
+                              for a fresh one once done with its chunk.
+                            - Only with the 'process' backend; unless actions
+                              are coroutine functions (concurrency).
+    :var.max_respawns: most workers that die along a run (eg. of a segfault, or
+                       at the hands of the OOM killer) to be replaced by fresh
+                       ones
+
+                            - The task a worker dies on is an error; as are
+                              the rest of its chunk (results are None).
+                            - Workers are not replaced once workers are
+                              signaled to stop (eg. in stop-on-error mode).
+    :var.cache: remembers results across runs; see ResultCache. None to act on
+                every task.
     :var.correlate_tasks_to_results: whether we correlate tasks to results
 
                                         - If True, provide list of tuple::
@@ -37,10 +153,101 @@ class Reactor(object):
                                                 [(<task>, <result>),
                                                 (<task>, <result>)]
 
+                                          Tasks are not shipped back by the
+                                          workers; the master holds on to
+                                          them until their results arrive.
+
                                         - Else provide list of result's::
 
                                                 [<result>, <result>]
 
+    :var.ordered: whether results are provided in order of tasks
+
+                        - Workers return results along with the index of their
+                          chunk; the master places them by index.
+                        - Else results are provided in order of arrival.
+
+    :var.chunksize: nb of tasks handed to a worker in one go
+
+                        - Results travel back in chunks as well.
+                        - 'auto' picks a size from the nb of tasks and the
+                          parallelism; or 1 if the nb of tasks is not known
+                          upfront.
+
+    :var.prefetch: nb of chunks per worker that may wait in the task queue
+
+                        - Tasks are fed lazily; the bounded task queue holds
+                          back the feeder until the workers catch up.
+
+    :var.lookahead: nb of tasks read ahead of those handed out; when
+                    prioritizing
+
+                        - Tasks are handed out in order of priority amongst
+                          those read so far; a larger window orders them more
+                          strictly, at the expense of memory and of a later
+                          first chunk.
+
+    :var.scheduler: how chunks of tasks are handed to workers
+
+                        - 'shared': workers take chunks off a single task
+                          queue.
+                        - 'stealing': every worker has a queue of its own, fed
+                          in turn by the master; a worker whose queue runs dry
+                          takes chunks off the queues of its peers. Workers
+                          contend on a lock only when stealing.
+
+    :var.backend: what workers are; 'process' or 'thread'
+
+                        - Processes sidestep the GIL; tasks and results are
+                          pickled on their way to and from workers.
+                        - Threads are cheap enough to have hundreds of them
+                          (eg. for I/O bound actions); nothing is pickled.
+
+    :var.concurrency: nb of tasks a worker awaits at once; or None
+
+                        - If set, actions are coroutine functions (eg. `async
+                          def`); every worker runs an event loop and awaits
+                          up to concurrency tasks (in whole chunks) at once.
+                          A chunk is taken off the task queue as soon as
+                          there is room; not once the others are all done.
+                        - The task queue has room for prefetch chunks per
+                          task awaited at once; so that chunks are there for
+                          the taking.
+                        - Requires asyncio (Python 3.4+); not with the
+                          'stealing' scheduler.
+
+    :var.elastic: whether the pool of workers grows and shrinks along a run
+
+                        - The share of CPU time in the time taken by actions
+                          tells CPU bound actions from I/O bound ones.
+                        - Workers are added while tasks back up in the task
+                          queue; as long as they would not oversubscribe the
+                          CPUs. Workers are retired while they do.
+                        - Only with the 'shared' scheduler and the
+                          'process' backend.
+
+    :var.max_parallelism: most workers in elastic mode; None for 8 per CPU.
+    :var.elastic_interval: time between decisions in elastic mode (secs)
+
+    :var.transport: a SharedMemoryTransport to park large payloads in; or None
+
+                        - Only handles on parked payloads travel through the
+                          queues.
+
+    :var.on_task_start: called with every task before its action; or None
+    :var.on_task_done: called with every task, its result and the time taken by
+                       its action (secs) after its action; or None
+
+                        - Hooks run in the workers; exceptions in hooks are
+                          errors of their task.
+
+    :var.persistent: whether workers are kept warm across runs
+
+                        - If True, workers are started on the first run and
+                          serve every run until the reactor is closed.
+                        - Else, workers are started and joined on every run
+                          and the reactor is spent after one run.
+
     """
     # nb of workers by default
     parallelism = 5
@@ -48,30 +255,203 @@ class Reactor(object):
     # time to wait for result of a task (secs)
     result_timeout = 300
 
+    # time between checks on the liveness of workers (secs)
+    poll_interval = 0.1
+
+    # time given to actions in flight on a stop signal (secs); if any
+    grace_period = None
+
+    # time an action may take (secs); if limited
+    task_timeout = None
+
+    # most workers that die along a run to be replaced by fresh ones
+    max_respawns = 0
+
+    # remembers results across runs; if anything
+    cache = None
+
     # whether we correlate tasks to results
     correlate_tasks_to_results = False
 
+    # whether results are provided in order of tasks
+    ordered = False
+
+    # nb of tasks handed to a worker in one go
+    chunksize = 1
+
+    # nb of chunks per worker that may wait in the task queue
+    prefetch = 2
+
+    # nb of tasks read ahead of those handed out; when prioritizing
+    lookahead = 10000
+
+    # how chunks of tasks are handed to workers; 'shared' or 'stealing'
+    scheduler = 'shared'
+
+    # what workers are; 'process' or 'thread'
+    backend = 'process'
+
+    # nb of tasks a worker awaits at once; if actions are coroutine functions
+    concurrency = None
+
+    # whether the pool of workers grows and shrinks along a run
+    elastic = False
+
+    # most workers in elastic mode; None for 8 per CPU
+    max_parallelism = None
+
+    # time between decisions in elastic mode (secs)
+    elastic_interval = 0.5
+
+    # whether workers are kept warm across runs
+    persistent = False
+
+    # where to park large payloads; if anywhere
+    transport = None
+
+    # called with every task before its action; if anything
+    on_task_start = None
+
+    # called with every task, its result and duration after its action; if
+    # anything
+    on_task_done = None
+
     def __init__(self, stop_on_error, parallelism=parallelism,
-                 result_timeout=result_timeout):
+                 result_timeout=result_timeout, persistent=persistent,
+                 transport=transport, on_task_start=on_task_start,
+                 on_task_done=on_task_done, scheduler=scheduler,
+                 elastic=elastic, max_parallelism=max_parallelism,
+                 backend=backend, concurrency=concurrency,
+                 grace_period=grace_period, task_timeout=task_timeout,
+                 max_respawns=max_respawns, cache=cache):
         """
         Initializer.
 
         :param stop_on_error: stop all workers if there is an exception in any
                              one of them.
         :type stop_on_error: bool
-        :param parallelism: degree of parallelism.
-        :type parallelism: int
+        :param parallelism: degree of parallelism; 'auto' for one worker per
+                            CPU (the process may run on). The initial degree
+                            of parallelism in elastic mode.
+        :type parallelism: int or str
         :param result_timeout: time to wait (secs) for result of a task.
 
                                  - Recommended to set it to the max time it may
                                    take for a worker to process a result.
         :type result_timeout: int
+        :param persistent: keep a pool of warm workers across runs; until the
+                           reactor is closed.
+
+                             - The action must be picklable (eg. a module level
+                               function) since it is shipped to the workers
+                               on every run.
+        :type persistent: bool
+        :param transport: park large tasks and results in shared memory; see
+                          SharedMemoryTransport. One transport per reactor.
+        :type transport: SharedMemoryTransport
+        :param on_task_start: hook; called in the worker with every task,
+                              before its action.
+        :type on_task_start: callable
+        :param on_task_done: hook; called in the worker with every task, its
+                             result (None if the action failed) and the time
+                             taken by its action (secs).
+        :type on_task_done: callable
+        :param scheduler: how chunks of tasks are handed to workers; 'shared'
+                          (a single task queue) or 'stealing' (a queue per
+                          worker; idle workers steal from busy peers).
+        :type scheduler: str
+        :param elastic: grow and shrink the pool of workers along a run; from
+                        the load observed. Only with the 'shared' scheduler.
+        :type elastic: bool
+        :param max_parallelism: most workers in elastic mode; 8 per CPU by
+                                default.
+        :type max_parallelism: int
+        :param backend: what workers are; 'process', 'thread' or a backend
+                        object (see ProcessBackend).
+        :type backend: str or object
+        :param concurrency: nb of tasks a worker awaits at once; for coroutine
+                            actions (eg. `async def`). Requires asyncio.
+        :type concurrency: int
+        :param grace_period: on a stop signal (eg. an error in stop-on-error
+                             mode), time given to actions in flight before
+                             their workers are terminated (secs). None lets
+                             them run to completion.
+        :type grace_period: float
+        :param task_timeout: time an action may take (secs); enforced by the
+                             workers. An action that runs out of time is an
+                             error of its task.
+        :type task_timeout: float
+        :param max_respawns: most workers that die along a run (eg. of a
+                             segfault) to be replaced by fresh ones. The task
+                             a worker dies on is reported as an error.
+        :type max_respawns: int
+        :param cache: remembers results across runs (see LRUCache and
+                      DiskCache); tasks whose results it remembers are
+                      answered by the master, rather than fed to the workers.
+                      It may be shared by reactors; it is not closed with the
+                      reactor.
+        :type cache: ResultCache
         :return: None
         :rtype: None
         """
+        if backend in BACKENDS:
+            backend = BACKENDS[backend]()
+        elif isinstance(backend, basestring):
+            raise Error('backend must be \'process\' or \'thread\'.')
+
+        if scheduler not in ('shared', 'stealing'):
+            raise Error('scheduler must be \'shared\' or \'stealing\'.')
+
+        if elastic and scheduler != 'shared':
+            raise Error('elastic mode requires the \'shared\' scheduler.')
+
+        if elastic and not isinstance(backend, ProcessBackend):
+            raise Error('elastic mode requires the \'process\' backend.')
+
+        if grace_period is not None and not isinstance(backend,
+                                                       ProcessBackend):
+            raise Error('grace_period requires the \'process\' backend.')
+
+        if task_timeout is not None:
+            if task_timeout <= 0:
+                raise Error('task_timeout must be a positive number.')
+            if concurrency is None and not isinstance(backend, ProcessBackend):
+                raise Error('task_timeout requires the \'process\' backend; '
+                            'unless actions are coroutine functions.')
+
+        if max_respawns < 0:
+            raise Error('max_respawns must be a non-negative int.')
+
+        if concurrency is not None:
+            if asyncio is None:
+                raise Error('concurrency requires asyncio (Python 3.4+).')
+            if concurrency < 1:
+                raise Error('concurrency must be a positive int.')
+            if scheduler == 'stealing':
+                raise Error('concurrency requires the \'shared\' scheduler.')
+
+        if parallelism == 'auto':
+            parallelism = cpu_count()
+
+        if max_parallelism is None:
+            max_parallelism = max(parallelism, 8 * cpu_count())
+
         self.stop_on_error = stop_on_error
         self.parallelism = parallelism
+        self.backend = backend
+        self.concurrency = concurrency
+        self.grace_period = grace_period
+        self.task_timeout = task_timeout
+        self.max_respawns = max_respawns
+        self.cache = cache
+        self.elastic = elastic
+        self.max_parallelism = max_parallelism
         self.result_timeout = result_timeout
+        self.persistent = persistent
+        self.transport = transport
+        self.on_task_start = on_task_start
+        self.on_task_done = on_task_done
+        self.scheduler = scheduler
 
         # if true; run enslaved task
         self.__fire = False
@@ -79,20 +459,52 @@ class Reactor(object):
         # a pool of workers
         self.__workers = []
 
-        # a bunch of tasks
-        self.__tasks = multiprocessing.Queue()
-
-        # results of tasks
-        self.__results = multiprocessing.Queue()
+        # orders to persistent workers; one inbox per worker
+        self.__inboxes = []
+
+        # results, errors and done markers of workers; one channel (the
+        # reading end of a pipe) per worker, so that a worker that dies can
+        # neither hold up the others nor go unnoticed.
+        self.__channels = []
+
+        # where every worker is at; [<index of chunk>, <size of chunk>,
+        # <position in chunk>]. Index is -1 between chunks. Written by the
+        # worker, read by the master once the worker is dead.
+        self.__cursors = []
+
+        # state of a worker; of its own even if workers are threads. In a
+        # worker only:
+        #   - outlet: the writing end of its channel
+        #   - cursor: where it is at
+        #   - tasks: the task queue it takes chunks off
+        #   - peers: queues of the other workers; when stealing
+        #   - loop: its event loop; when actions are coroutine functions
+        #   - timed_out: whether an action ran out of time; so that the worker
+        #     makes way for a fresh one
+        #   - partial: results of the run folded so far; if folding
+        self.__local = threading.local()
+
+        # a bunch of tasks; bounded so that tasks are fed no faster than the
+        # workers can take them.
+        self.__tasks = self.__task_queue()
+
+        # a queue of tasks per worker; when stealing
+        self.__queues = []
 
         # results to be returned to the caller
         self.final_results = []
 
-        # any errors
-        self.__errors = multiprocessing.Queue()
+        # signal to workers to stop if something goes wrong; workers peek at
+        # it without blocking, so it costs nothing while all is well.
+        self.__stop_event = self.backend.Event()
+
+        # set once the master is done with the current run; tells the feeder
+        # to give up on workers that are gone.
+        self.__wound_up = threading.Event()
 
-        # signalling channel to workers to stop if something goes wrong
-        self.__stop_channel = multiprocessing.Queue()
+        # identifies the current run; tags tasks, results and errors so that
+        # leftovers of an aborted run do not bleed into the next one.
+        self.__batch_id = 0
 
         # enslaved action
         self.__action = None
@@ -100,316 +512,2666 @@ class Reactor(object):
         # the tasks that the user has entrusted us with
         self.tasks = None
 
+        # nb of tasks, if known upfront
+        self.__size = None
+
+        # nb of tasks fed to the workers so far
+        self.__nb_tasks = 0
+
+        # positions of the tasks of chunks awaiting their results, in the
+        # tasks given; by index of chunk. Only when prioritizing.
+        self.__positions = {}
+
+        # chunks of tasks awaiting their results; by index of chunk. Only
+        # when correlating tasks to results.
+        self.__in_flight = {}
+
+        # error while iterating over the tasks
+        self.__feed_error = None
+
+        # chunks of results answered by the cache; by the feeder, for the
+        # master to hand out along with those of the workers.
+        self.__answered = collections.deque()
+
+        # (<cache keys>, <journal keys>) of the tasks of chunks awaiting their
+        # results; by index of chunk. Only with a cache or a journal.
+        self.__keys = {}
+
+        # nb of tasks of the current run that have no journal key; and so
+        # are not journaled
+        self.__nb_keyless = 0
+
+        # checkpoints the current run; if anything
+        self.__journal = None
+
+        # orders tasks of the current run by priority; if anything (see run)
+        self.__priority = None
+
+        # folds results in the workers, the aggregate to start with, and
+        # combines partial aggregates in the master; if folding
+        self.__reducer = None
+        self.__initial = None
+        self.__combiner = None
+
+        # partial aggregates of the current run combined so far
+        self.__aggregate = None
+
+        # why the aggregate of the current run is incomplete; if it is
+        self.__aggregate_error = None
+
         # error by any of the workers
         self.error = None
 
+        # metrics of the current (or last) run
+        self.stats = Stats()
+
+        # nb of workers spawned so far; names new workers
+        self.__nb_spawned = 0
+
+        # guards the pool of workers against changes once the last poison
+        # pills are lined up; in elastic mode.
+        self.__pool_lock = threading.Lock()
+
+        # set once the last poison pills of the run are lined up
+        self.__fed_pills = False
+
+        # workers retired along the run (elastic mode); by an extra pill each
+        self.__nb_retired = 0
+
+        # workers serving the run; neither retired nor dead
+        self.__nb_active = 0
+
+        # time taken by actions and CPU time spent on them (secs); since the
+        # last decision in elastic mode
+        self.__load = [0.0, 0.0]
+
+        # when the stop signal was raised on the current run; if it was
+        self.__stopped_at = None
+
+        # workers terminated on a hard stop; and when
+        self.__terminated = {}
+
+        # workers replaced along the current run after they died
+        self.__nb_respawned = 0
+
+        # winds down the last run; if it was given up on early on an error
+        self.__winding_down = None
+
         # set to indicate that the reactor is unusable
         self.spent = False
 
+        if self.persistent:
+            _open_reactors.add(self)
+
     def run(self, tasks, action,
-            correlate_tasks_to_results=correlate_tasks_to_results):
+            correlate_tasks_to_results=correlate_tasks_to_results,
+            chunksize=chunksize, ordered=ordered, journal=None, sink=None,
+            reducer=None, initial=None, combiner=None, priority=None):
         """
         Distribute tasks amongst n workers.
 
         :param action: the action to be done using task data points. Must be
                        __callable__
         :type action: callable
-        :param tasks: data points
-        :type tasks: list of objects
+        :param tasks: data points; any iterable, eg. a generator.
+
+                        - Iterated over lazily while the workers work.
+        :type tasks: iterable of objects
         :param correlate_tasks_to_results: If True, then return a list of tuples
                                            of (<task>, <results>).
                                            Else, return a list of <results>.
         :type correlate_tasks_to_results: bool
-        :return: list of results
-        :rtype: list
+        :param chunksize: nb of tasks handed to a worker in one go; or 'auto'.
+
+                            - Larger chunks amortize the cost of queueing
+                              tiny tasks; at the expense of load balancing.
+        :type chunksize: int or str
+        :param ordered: If True, then results are in order of tasks.
+                        Else, in order of arrival.
+        :type ordered: bool
+        :param journal: checkpoint the run to a journal (a path, or a
+                        Journal); tasks whose results were journaled by a
+                        previous run over the same tasks are not acted upon
+                        again.
+        :type journal: str or Journal
+        :param sink: consumes results as they arrive (see ResultSink); rather
+                     than have them gathered in final_results.
+        :type sink: ResultSink
+        :param reducer: fold results in the workers;
+                        (<aggregate>, <result>) -> <aggregate>. Each worker
+                        folds the results of its own tasks, and hands its
+                        partial aggregate over once done with the run; rather
+                        than send results task by task.
+
+                          - A worker that dies takes its partial aggregate
+                            with it; run raises Error, whatever
+                            stop_on_error.
+        :type reducer: callable
+        :param initial: the aggregate to start with; in every worker, and in
+                        the master (each folds a copy of its own). Must be
+                        neutral (eg. 0 for a sum); required with a reducer.
+        :type initial: object
+        :param combiner: combine partial aggregates in the master;
+                         (<aggregate>, <partial aggregate>) -> <aggregate>.
+                         The reducer by default.
+        :type combiner: callable
+        :param priority: hand tasks to the workers in order of priority; the
+                         lowest first. Either a key function;
+                         <task> -> <priority>. Or True, if tasks are
+                         (<priority>, <task>) tuples.
+
+                            - Tasks are read lazily; up to lookahead of them
+                              ahead of those handed out.
+                            - Ordered results, correlation and journals still
+                              follow the order given.
+        :type priority: callable or bool
+        :return: list of results; or a summary of the sink if any (see
+                 ResultSink.summary); or the aggregate if folding
+        :rtype: list or dict or object
+        """
+        self.ordered = ordered
+        self.final_results = []
+
+        if reducer is not None:
+            if initial is None:
+                raise Error('reducer requires an initial aggregate; eg. 0 '
+                            'for a sum.')
+
+            if correlate_tasks_to_results or journal or sink or self.cache:
+                raise Error('reducer cannot be combined with correlation, a '
+                            'journal, a sink or a cache.')
+
+            for _ in self.__stream(tasks, action, False, chunksize, None,
+                                   priority,
+                                   (reducer, initial, combiner or reducer)):
+                # nothing but the load of elastic workers; partial
+                # aggregates are combined as they arrive.
+                pass
+
+            if self.__aggregate_error is not None:
+                # whatever stop_on_error; nothing else tells the caller.
+                raise Error('the aggregate is incomplete: {}'.format(
+                    self.__aggregate_error))
+
+            return self.__aggregate
+
+        if sink is not None:
+            # results are consumed one by one; the master holds on to
+            # nothing but results held back until their turn (if ordered).
+            try:
+                for _result in self.stream(tasks, action,
+                                           correlate_tasks_to_results,
+                                           chunksize, ordered, journal,
+                                           priority):
+                    sink.add(_result)
+            finally:
+                sink.close()
+                # the workers may be winding down still; see stream.
+                self.__settle()
+
+            return sink.summary()
+
+        for (_index, _results) in self.__stream(tasks, action,
+                                                correlate_tasks_to_results,
+                                                chunksize, journal, priority):
+            if not self.ordered:
+                self.final_results.extend(_results)
+                continue
+
+            _end = _index + len(_results)
+            if _end > len(self.final_results):
+                # make room; for all tasks at once if we know how many.
+                _room = max(_end, self.__size or 0) - len(self.final_results)
+                self.final_results.extend([None] * _room)
+
+            self.final_results[_index:_end] = _results
+
+        if self.ordered and len(self.final_results) < self.__nb_tasks:
+            # results of the last tasks are lost; eg. their worker died.
+            self.final_results.extend(
+                [None] * (self.__nb_tasks - len(self.final_results)))
+
+        return self.final_results
+
+    def stream(self, tasks, action,
+               correlate_tasks_to_results=correlate_tasks_to_results,
+               chunksize=chunksize, ordered=ordered, journal=None,
+               priority=None):
+        """
+        Distribute tasks amongst n workers; and yield results as they arrive.
+          - Results are yielded in order of arrival; unless ordered, in which
+            case results that arrive early are held back until their turn.
+          - In stop-on-error mode, the first error is raised (as Error) by the
+            iterator as soon as it is detected. The workers wind down in the
+            background; the next run (or close) waits for them.
+          - Abandoning the iterator early stops the workers.
+
+        :param action: the action to be done using task data points. Must be
+                       __callable__
+        :type action: callable
+        :param tasks: data points; any iterable, eg. a generator.
+        :type tasks: iterable of objects
+        :param correlate_tasks_to_results: If True, then yield tuples of
+                                           (<task>, <results>).
+                                           Else, yield <results>.
+        :type correlate_tasks_to_results: bool
+        :param chunksize: nb of tasks handed to a worker in one go; or 'auto'.
+        :type chunksize: int or str
+        :param ordered: If True, then yield results in order of tasks.
+                        Else, in order of arrival.
+        :type ordered: bool
+        :param journal: checkpoint the run to a journal (a path, or a
+                        Journal).
+        :type journal: str or Journal
+        :param priority: hand tasks to the workers in order of priority; a key
+                         function, or True if tasks are (<priority>, <task>)
+                         tuples.
+        :type priority: callable or bool
+        :return: iterator over results
+        :rtype: generator
+        """
+        self.ordered = ordered
+
+        # results held back until their turn; by index of their chunk.
+        _held = {}
+        _next_index = 0
+
+        _chunks = self.__stream(tasks, action, correlate_tasks_to_results,
+                                chunksize, journal, priority, eager=True)
+        try:
+            for (_index, _results) in _chunks:
+                if not self.ordered:
+                    for _result in _results:
+                        yield _result
+                    continue
+
+                _held[_index] = _results
+                while _next_index in _held:
+                    _results = _held.pop(_next_index)
+                    _next_index += len(_results)
+                    for _result in _results:
+                        yield _result
+
+            # whatever is left was held back behind lost results.
+            for _index in sorted(_held):
+                for _result in _held[_index]:
+                    yield _result
+        finally:
+            _chunks.close()
+
+    def __stream(self, tasks, action, correlate_tasks_to_results, chunksize,
+                 journal, priority=None, reduction=None, eager=False):
+        """
+        Distribute tasks amongst n workers; and yield chunks of results as they
+        arrive.
+
+        :param action: the action to be done using task data points.
+        :type action: callable
+        :param tasks: data points
+        :type tasks: iterable of objects
+        :param correlate_tasks_to_results: whether we correlate tasks to results
+        :type correlate_tasks_to_results: bool
+        :param chunksize: nb of tasks handed to a worker in one go; or 'auto'.
+        :type chunksize: int or str
+        :param journal: checkpoint the run to a journal; if any
+        :type journal: str or Journal
+        :param priority: a key function; or True if tasks are (<priority>,
+                         <task>) tuples. If prioritizing.
+        :type priority: callable or bool
+        :param reduction: (<reducer>, <initial>, <combiner>); if folding
+        :type reduction: tuple
+        :param eager: in stop-on-error mode, raise the error as soon as it is
+                      detected; and leave the workers to wind down in the
+                      background (see __settle). Else once they have.
+        :type eager: bool
+        :return: iterator over (<index of chunk>, <list of results>)
+        :rtype: generator
         """
+        self.__settle()
+
+        if self.spent:
+            raise Error('Reactor is spent; create a new one.')
+
+        if chunksize != 'auto' and not (
+                isinstance(chunksize, numbers.Integral) and
+                not isinstance(chunksize, bool) and chunksize >= 1):
+            raise Error('chunksize must be a positive int or \'auto\'.')
+
+        if priority not in (None, True) and not callable(priority):
+            raise Error('priority must be a key function; or True for '
+                        '(<priority>, <task>) tasks.')
+
         self.correlate_tasks_to_results = correlate_tasks_to_results
+        self.chunksize = chunksize
 
         _time_format = '%d-%b-%Y %H:%M:%S %Z'  # 4-Feb-2016 09:14:52 EST
 
-        self.__load_tasks(tasks)
+        # a clean slate for this run.
+        self.__batch_id += 1
+        self.__stop_event.clear()
+        self.__wound_up.clear()
+        self.error = None
+        self.__nb_tasks = 0
+        self.__positions = {}
+        self.__in_flight = {}
+        self.__feed_error = None
+        self.__answered.clear()
+        self.__keys = {}
+        self.__nb_keyless = 0
+        self.stats = Stats()
+        self.__fed_pills = False
+        self.__nb_retired = 0
+        self.__load = [0.0, 0.0]
+        self.__stopped_at = None
+        self.__nb_respawned = 0
+        self.__priority = priority
+        (self.__reducer, self.__initial, self.__combiner) = \
+            reduction or (None, None, None)
+        # a copy of its own; the combiner may well combine in place.
+        self.__aggregate = copy.deepcopy(self.__initial)
+        self.__aggregate_error = None
+
+        if isinstance(journal, basestring):
+            journal = Journal(journal)
+        self.__journal = journal
+        if self.__journal:
+            self.__journal.open()
+
+            log_msg = 'Resuming from {}; {} results journaled.'.format(
+                self.__journal.path, len(self.__journal.results))
+            logger.info(log_msg)
+
+        # the tasks that the user has entrusted us with.
+        self.tasks = tasks
+        if hasattr(tasks, '__len__'):
+            self.__size = len(tasks)
+        else:
+            self.__size = None
+
+        if self.chunksize == 'auto':
+            self.chunksize = self.__auto_chunksize()
 
         # enslave the action.
         self.__action = action
 
-        if len(self.tasks) < self.parallelism:
-            log_msg = "{} worker(s) work on {} tasks.".format(len(self.tasks),
-                                                              len(tasks))
-        else:
-            log_msg = "{} worker(s) work on {} tasks.".format(self.parallelism,
-                                                              len(tasks))
+        log_msg = "{} worker(s) work on {} tasks.".format(
+            self.__nb_workers(),
+            'a stream of' if self.__size is None else self.__size)
         logger.info(log_msg)
         log_msg = "Start time: {}".format(time.strftime(_time_format))
         logger.info(log_msg)
         _start_time = time.time()
-        self.__run_workers()
+        if not self.persistent or not self.__workers:
+            self.__run_workers()
+        self.__nb_active = len(self.__workers)
+
+        if self.persistent:
+            self.__dispatch_orders()
+
+        # feed tasks alongside processing results.
+        _feeder = threading.Thread(target=self.__load_tasks, args=(tasks,),
+                                   name='feeder')
+        _feeder.daemon = True
+        _feeder.start()
 
         log_msg = 'Processing results.'
         logger.info(log_msg)
-        self.__fetch_results()
+        _fetcher = self.__fetch_results()
+        _given_up = False
+        try:
+            for _results in _fetcher:
+                if _results is not None:
+                    yield _results
+                elif eager:
+                    _given_up = True
+                    break
+
+        except GeneratorExit:
+            # the caller has lost interest; stop the workers.
+            log_msg = 'master - results abandoned; signaling workers to stop.'
+            logger.warning(log_msg)
+
+            self.__stop_event.set()
+            self.__stopped_at = time.time()
+
+            # let the workers account for themselves.
+            for _results in _fetcher:
+                pass
+
+            self.__wrap_up(_feeder, _start_time)
+            raise
+
+        if _given_up:
+            # the rest of the run is moot; no need to wait for it.
+            self.__winding_down = threading.Thread(
+                target=self.__wind_down, args=(_fetcher, _feeder, _start_time),
+                name='wind-down')
+            self.__winding_down.daemon = True
+            self.__winding_down.start()
+            raise Error(self.error)
+
+        self.__wrap_up(_feeder, _start_time)
+
+        if self.__feed_error:
+            # the tasks could not all be fed; the results are incomplete.
+            self.error = self.__feed_error
+            raise Error(self.error)
+
+        # special stuff for errors in workers
+        if self.error and self.stop_on_error:
+            raise Error(self.error)
+
+    def __wind_down(self, fetcher, feeder, start_time):
+        """
+        Let the workers account for themselves after a run given up on early;
+        and wrap it up. Runs in a thread of the master.
+
+        :param fetcher: the results of the run; yet to be done
+        :type fetcher: generator
+        :param feeder: the thread feeding the task queue
+        :type feeder: threading.Thread
+        :param start_time: when the run started (secs since epoch)
+        :type start_time: float
+        :return: None
+        :rtype: None
+        """
+        for _ in fetcher:
+            pass
+
+        self.__wrap_up(feeder, start_time)
+
+    def __settle(self):
+        """
+        Wait for the last run to be wound down; if it was given up on early.
+
+        :return: None
+        :rtype: None
+        """
+        if self.__winding_down in (None, threading.current_thread()):
+            # nothing to wait for; or the wind-down closing the reactor.
+            return
+
+        self.__winding_down.join()
+        self.__winding_down = None
+
+    def __wrap_up(self, feeder, start_time):
+        """
+        Wait for the feeder and the workers to be done with the current run.
+
+        :param feeder: the thread feeding the task queue
+        :type feeder: threading.Thread
+        :param start_time: when the run started (secs since epoch)
+        :type start_time: float
+        :return: None
+        :rtype: None
+        """
+        _time_format = '%d-%b-%Y %H:%M:%S %Z'  # 4-Feb-2016 09:14:52 EST
+
+        self.__wound_up.set()
+        feeder.join()
 
         _end_time = time.time()
         log_msg = 'Finished processing.'
         log_msg += 'End time: {}'.format(time.strftime(_time_format))
         logger.info(log_msg)
 
-        _duration = _end_time - _start_time
+        _duration = _end_time - start_time
+        self.stats.duration = _duration
         log_msg = "---- {} secs ---- ".format(
             float("{0:.2f}".format(_duration)))
         logger.info(log_msg)
 
-        # special stuff for errors in workers
-        if self.error and self.stop_on_error:
-            # let's wait for stop tokens to be acknowledged
-            log_msg = 'master - waiting for stop tokens to be acknowledged.'
-            logger.info(log_msg)
-
-            # wait for workers to exit cleanly
-            for _worker in self.__workers:
-                _worker.join()
+        if self.transport:
+            # nothing is in flight anymore; whatever is parked is garbage.
+            self.transport.sweep()
 
-            # close out resources
-            self.__tasks.close()
-            self.__tasks.join_thread()
-            self.__errors.close()
-            self.__errors.join_thread()
-            self.__results.close()
-            self.__results.join_thread()
+        if self.cache:
+            self.cache.sync()
 
-            self.spent = True
+        if self.__journal:
+            self.__journal.close()
 
-            raise Error(self.error)
-
-        # business as usual; wait for workers to finish their job.
-        for _worker in self.__workers:
-            _worker.join()
+        if not self.persistent:
+            # workers have accounted for themselves; reap them.
+            self.close()
 
-        self.spent = True
+        elif self.__terminated:
+            # a worker may well have been terminated while holding the lock of
+            # a queue; start afresh.
+            log_msg = 'master - replacing the pool of workers after a hard '
+            log_msg += 'stop.'
+            logger.warning(log_msg)
 
-        return self.final_results
+            self.__shut_down()
+            self.__tasks = self.__task_queue()
 
-    def __load_tasks(self, tasks):
+    def close(self):
         """
-        Initialize task queue with task data-points and poison pills.
+        Shut down the workers and close out resources.
+          - The reactor is spent thereafter.
 
-        :param tasks: list of job descriptions
-        :type tasks: list of objects
         :return: None
         :rtype: None
         """
-        self.tasks = tasks
-        _poison_pill_ct = 0
-
-        log_msg = 'Loading up task queue.'
-        logger.debug(log_msg)
+        if self.spent:
+            return
 
-        for _task in tasks:
-            self.__tasks.put(_task)
+        self.__settle()
+        self.__shut_down()
 
-        # line up poison pills.
-        if len(self.tasks) < self.parallelism:
-            for i in xrange(len(self.tasks)):
-                self.__tasks.put(None)
-                _poison_pill_ct += 1
-        else:
-            for i in xrange(self.parallelism):
-                self.__tasks.put(None)
-                _poison_pill_ct += 1
+        if self.transport:
+            self.transport.close()
 
-        log_msg = 'Loaded task queue with {} tasks '.format(len(tasks))
-        log_msg += 'and {} poison pills.'.format(_poison_pill_ct)
-        logger.debug(log_msg)
+        self.spent = True
+        _open_reactors.discard(self)
 
-    def __run_workers(self):
+    def __shut_down(self):
         """
-        Fire off workers to work on tasks.
+        Shut down the workers and close out their queues and channels.
+          - Task queues are drained first if workers were terminated; what is
+            left in them is garbage, and nobody is there to take it.
 
         :return: None
         :rtype: None
         """
-        # light the fuse.
-        self.__fire = True
-
-        if len(self.tasks) < self.parallelism:
-            log_msg = 'Fewer tasks than parallelism; spawning fewer workers.'
+        if self.persistent and self.__workers:
+            log_msg = 'master - closing {} persistent workers.'.format(
+                len(self.__workers))
             logger.info(log_msg)
 
-            for i in xrange(len(self.tasks)):
-                self.__workers.append(
-                    # multiprocessing.Process(target=self.__action,
-                    #                         name='worker_%s' % i))
-                    multiprocessing.Process(target=self.__enslave,
-                                            name='worker_%s' % i))
+            for _inbox in self.__inboxes:
+                _inbox.put(None)
 
-        else:
-            for i in xrange(self.parallelism):
-                self.__workers.append(
-                    # multiprocessing.Process(target=self.__action,
-                    #                         name='worker_%s' % i))
-                    multiprocessing.Process(target=self.__enslave,
-                                            name='worker_%s' % i))
+        for _worker in self.__workers:
+            _worker.join()
 
-        log_msg = 'Initialized {} workers.'.format(len(self.__workers))
-        logger.info(log_msg)
+        # close out resources
+        for _queue in [self.__tasks] + self.__queues:
+            if self.__terminated:
+                self.__drain(_queue)
+            _queue.close()
+            _queue.join_thread()
 
-        # start workers
-        for (_worker_nb, _worker) in enumerate(self.__workers):
-            log_msg = 'Starting worker {}'.format(_worker_nb)
-            logger.debug(log_msg)
-            _worker.start()
+        for _inbox in self.__inboxes:
+            _inbox.close()
+            _inbox.join_thread()
 
-    # noinspection PyBroadException,PyUnusedLocal
-    def __enslave(self):
+        for _channel in self.__channels:
+            _channel.close()
+
+        self.__workers = []
+        self.__channels = []
+        self.__cursors = []
+        self.__inboxes = []
+        self.__queues = []
+        self.__terminated = {}
+
+    @staticmethod
+    def __drain(queue):
         """
-        A closure to condemn the action to the mundane world of multiprocessing.
+        Empty out a task queue that nobody is to take anything off anymore.
+          - Best effort; a worker terminated while holding the lock of the
+            queue leaves it locked. Items that cannot be drained are given up
+            on; so that closing the queue does not hang.
 
+        :param queue: a task queue
+        :type queue: multiprocessing.Queue
         :return: None
         :rtype: None
         """
-        _worker_name = multiprocessing.current_process().name
+        while True:
+            try:
+                queue.get(block=False)
+            except Queue.Empty:
+                break
 
-        log_msg = 'Started {}, pid: {}, ppid: {}'.format(_worker_name,
-                                                         os.getpid(),
-                                                         os.getppid())
-        logger.info(log_msg)
+        queue.cancel_join_thread()
 
-        while True:
-            # no errors to begin with!!
-            _stop = None
+    def __task_queue(self):
+        """
+        A (bounded) task queue; room for prefetch chunks per worker. Or, if
+        actions are coroutine functions, per task a worker awaits at once.
 
-            # check if we need to worry about stop tokens.
-            try:
-                if self.stop_on_error:
+        :return: a task queue
+        :rtype: multiprocessing.Queue
+        """
+        return self.backend.Queue(
+            maxsize=self.prefetch * (self.concurrency or 1) *
+            (self.max_parallelism if self.elastic else self.parallelism))
 
-                    log_msg = '{} '.format(_worker_name)
-                    log_msg += 'checking for stop tokens.'
-                    logger.debug(log_msg)
+    def __enter__(self):
+        return self
 
-                    _stop = self.__stop_channel.get(block=True, timeout=1)
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
-                    if _stop is not None:
-                        log_msg = '{} '.format(_worker_name)
-                        log_msg += 'got a stop token. '
-                        logger.warn(log_msg)
+    def __nb_workers(self):
+        """
+        Number of workers serving the current run.
+          - Persistent workers all serve every run.
+          - Else, no more workers than tasks are spawned.
 
-                    if _stop == 'stop':
-                        log_msg = '{} '.format(_worker_name)
-                        log_msg += 'got a valid stop token; stopping actions.'
-                        logger.warn(log_msg)
+        :return: nb of workers
+        :rtype: int
+        """
+        if self.persistent and self.__workers:
+            return len(self.__workers)
 
-                        # prevent deadlocks
-                        log_msg = '{} '.format(_worker_name)
-                        log_msg += 'flushing tasks.'
-                        logger.debug(log_msg)
-                        while True:
-                            _task = self.__tasks.get()
-                            if _task is None:
-                                # the poison pill
-                                return
+        if (self.persistent or self.__size is None or
+                self.__size >= self.parallelism):
+            return self.parallelism
 
-            except Queue.Empty:
+        return self.__size
 
-                log_msg = '{} '.format(_worker_name)
-                log_msg += 'got no stop tokens; keep working.'
-                logger.debug(log_msg)
+    def __auto_chunksize(self):
+        """
+        Pick a chunksize from the nb of tasks and the parallelism.
+          - Aims for about 4 chunks per worker.
+          - Falls back to 1 if the nb of tasks is not known upfront.
 
-            # actions on tasks
-            log_msg = '{} '.format(_worker_name)
-            log_msg += 'fetching tasks.'
-            logger.debug(log_msg)
+        :return: chunksize
+        :rtype: int
+        """
+        if self.__size is None:
+            return 1
 
-            _task = self.__tasks.get()
+        (_chunksize, _extra) = divmod(self.__size,
+                                      max(self.__nb_workers(), 1) * 4)
+        if _extra or not _chunksize:
+            _chunksize += 1
 
-            if _task is None:
-                # the poison pill
-                log_msg = '{} '.format(_worker_name)
-                log_msg += 'finished all tasks.'
-                logger.info(log_msg)
-                return
+        return _chunksize
 
-            try:
-                _result = self.__action(_task)
+    def __dispatch_orders(self):
+        """
+        Hand the current run to the persistent workers; one order each.
 
-                if self.correlate_tasks_to_results:
-                    _result = (_task, _result)
+        :return: None
+        :rtype: None
+        """
+        _order = self.__order()
 
-                self.__results.put(_result)
+        if isinstance(self.backend, ProcessBackend):
+            # an inbox pickles orders in a thread of its own; an order that
+            # fails to pickle there is lost, and the run would wait in vain.
+            try:
+                pickle.dumps(_order, 2)
             except Exception as e:
-                log_msg = '{} '.format(_worker_name)
-                log_msg += 'has had an exception. Adding to error queue. '
-                log_msg += 'Exception details: {}'.format(e.args[0])
-                logger.error(log_msg)
-                if self.correlate_tasks_to_results:
-                    _result = (_task, None)
-                else:
-                    _result = None
+                raise Error('the action (and reducer) of a persistent '
+                            'reactor must be picklable; eg. functions of a '
+                            'module: {!r}'.format(e))
 
-                self.__results.put(_result)
-                self.__errors.put(
-                    "".join(traceback.format_exception(*sys.exc_info())))
+        for _inbox in self.__inboxes:
+            _inbox.put(_order)
 
-    def __fetch_results(self):
+    def __order(self):
         """
-        Process results from the slave worker.
-          - Populate the final list of results to be returned to the user.
-          - Will take care of stopping other workers if one of them had signaled
-            an error.
-          - Max number of results must equal the number of tasks.
-             - If not, then will wait for result_timeout secs before assuming
-               that all processing is completed.
+        :return: the current run; as an order to a persistent worker
+        :rtype: tuple
+        """
+        return (self.__batch_id, self.__action, self.__reducer,
+                self.__initial)
 
+    # noinspection PyBroadException
+    def __load_tasks(self, tasks):
+        """
+        Feed the task queue with chunks of task data-points and poison pills.
+          - Runs in a thread of the master; the bounded task queue holds it
+            back until the workers catch up.
+          - Stops feeding tasks if the workers have been signaled to stop; or
+            once the master is done with the run (eg. all workers are gone).
+          - If prioritizing, chunks are made up of the most urgent tasks
+            pending; and the bounded task queue keeps them from falling
+            behind many a chunk of lesser ones.
+
+        :param tasks: job descriptions
+        :type tasks: iterable of objects
         :return: None
         :rtype: None
         """
+        _poison_pill_ct = 0
+        _chunk_ct = 0
 
-        # max number of results equal number of tasks
-        for i in xrange(len(self.tasks)):
+        # the queues to feed; the pool of workers may shrink along the way.
+        if self.scheduler == 'stealing':
+            _queues = list(self.__queues)
+        else:
+            _queues = [self.__tasks]
 
-            if self.stop_on_error:
-                log_msg = 'master - checking for errors in workers.'
-                logger.debug(log_msg)
-                try:
-                    # wait for the worker to act; and block for some time.
-                    if i == 0:
-                        _error = self.__errors.get(block=True, timeout=1)
-                    else:
-                        _error = self.__errors.get(block=False)
-
-                    if _error:
-                        # some worker has had an error; signal on stop channel
-                        log_msg = 'master - worker signaled an exception'
-                        log_msg += 'error info: {}'.format(_error)
-                        logger.error(log_msg)
-
-                        log_msg = 'signaling error to other workers.'
-                        logger.warn(log_msg)
-
-                        # noinspection PyUnusedLocal
-                        for _worker in self.__workers:
-                            self.__stop_channel.put('stop')
-
-                        self.error = _error
-                        return
-                except Queue.Empty:
-                    log_msg = 'master - no exception in any of the workers.'
-                    logger.debug(log_msg)
+        log_msg = 'Loading up task queue; {} tasks per chunk.'.format(
+            self.chunksize)
+        logger.debug(log_msg)
 
-            # process results
-            try:
-                log_msg = 'master - fetching result '
-                log_msg += '(will block for {} secs)'.format(
-                    self.result_timeout)
-                logger.debug(log_msg)
-                _result = self.__results.get(block=True,
-                                             timeout=self.result_timeout)
-                log_msg = 'master - got result {}'.format(
-                    pprint.pformat(_result))
+        try:
+            if self.__priority:
+                _tasks = self.__prioritize(tasks)
+            else:
+                _tasks = iter(tasks)
+            _fed = True
+            while _fed and not self.__stop_event.is_set():
+                _chunk = list(itertools.islice(_tasks, self.chunksize))
+                if not _chunk:
+                    break
+
+                # where the tasks are in the tasks given; in a row, unless
+                # prioritizing.
+                if self.__priority:
+                    (_positions, _chunk) = [list(_x) for _x in zip(*_chunk)]
+                else:
+                    _positions = range(self.__nb_tasks,
+                                       self.__nb_tasks + len(_chunk))
+
+                if self.cache or self.__journal:
+                    _pieces = self.__consult(_positions, _chunk)
+                else:
+                    _pieces = [(_chunk, None, None, None, _positions)]
+
+                for (_chunk, _keys, _journal_keys, _results,
+                     _positions) in _pieces:
+                    if self.__priority:
+                        self.__positions[self.__nb_tasks] = _positions
+
+                    if _results is not None:
+                        # answered by the cache.
+                        if self.correlate_tasks_to_results:
+                            _results = list(zip(_chunk, _results))
+                        self.__answered.extend(
+                            self.__place(self.__nb_tasks, _results))
+                        self.__nb_tasks += len(_chunk)
+                        continue
+
+                    if self.correlate_tasks_to_results:
+                        # hold on to the tasks; rather than have them shipped
+                        # back along with the results.
+                        self.__in_flight[self.__nb_tasks] = _chunk
+
+                    if self.cache or self.__journal:
+                        self.__keys[self.__nb_tasks] = (_keys, _journal_keys)
+
+                    if self.transport:
+                        _chunk = [self.transport.pack(_task)
+                                  for _task in _chunk]
+
+                    # queues in turn; a few chunks at a time, so that chunks
+                    # are spread over workers in batches.
+                    _turn = (_chunk_ct // self.prefetch) % len(_queues)
+                    _fed = self.__feed((self.__batch_id, self.__nb_tasks,
+                                        _chunk, time.time()),
+                                       _queues[_turn:] + _queues[:_turn])
+                    if not _fed:
+                        break
+
+                    _chunk_ct += 1
+                    self.__nb_tasks += len(_chunk)
+
+        except Exception:
+            self.__feed_error = "".join(
+                traceback.format_exception(*sys.exc_info()))
+
+            log_msg = 'master - failed to iterate over tasks: {}'.format(
+                self.__feed_error)
+            logger.error(log_msg)
+
+        finally:
+            # line up poison pills; one per worker.
+            if self.scheduler == 'stealing':
+                _pill_queues = _queues
+            elif self.elastic:
+                with self.__pool_lock:
+                    # the pool of workers is settled from now on.
+                    self.__fed_pills = True
+                    _pill_queues = _queues * (len(self.__workers) -
+                                              self.__nb_retired)
+            else:
+                _pill_queues = _queues * self.__nb_workers()
+
+            for _queue in _pill_queues:
+                if not self.__feed((self.__batch_id, None, None, None),
+                                   [_queue]):
+                    break
+                _poison_pill_ct += 1
+
+        log_msg = 'Loaded task queue with {} tasks '.format(self.__nb_tasks)
+        log_msg += 'in {} chunks '.format(_chunk_ct)
+        log_msg += 'and {} poison pills.'.format(_poison_pill_ct)
+        logger.debug(log_msg)
+
+    def __prioritize(self, tasks):
+        """
+        Yield tasks in order of priority, the lowest first; along with their
+        position in the tasks given.
+          - Tasks are read lazily; at most lookahead of them ahead of those
+            yielded, so the most urgent amongst those read goes first.
+          - Tasks of equal priority are in the order given.
+
+        :param tasks: job descriptions; or (<priority>, <task>) tuples
+        :type tasks: iterable of objects
+        :return: iterator over (<position>, <task>)
+        :rtype: generator
+        """
+        _pending = []
+        for (i, _task) in enumerate(tasks):
+            if self.__priority is True:
+                (_priority, _task) = _task
+            else:
+                _priority = self.__priority(_task)
+            heapq.heappush(_pending, (_priority, i, _task))
+
+            if len(_pending) > self.lookahead:
+                (_, j, _task) = heapq.heappop(_pending)
+                yield (j, _task)
+
+        while _pending:
+            (_, j, _task) = heapq.heappop(_pending)
+            yield (j, _task)
+
+    def __consult(self, positions, chunk):
+        """
+        Look the tasks of a chunk up in the journal; and those not in it, in
+        the cache.
+          - The chunk is split into pieces; runs of tasks whose results are
+            known, and runs of tasks to be fed to the workers.
+
+        :param positions: positions of the tasks of the chunk in the tasks
+                          given
+        :type positions: list
+        :param chunk: chunk of tasks
+        :type chunk: list
+        :return: [(<tasks>, <their cache keys>, <their journal keys>, <their
+                 results; None if to be fed>, <their positions>)]
+        :rtype: list
+        """
+        _journaled = self.__journal.results if self.__journal else {}
+
+        _pieces = []
+        for (j, _task) in enumerate(chunk):
+            (_key, _journal_key) = (None, None)
+            (_hit, _result) = (False, None)
+
+            if self.cache:
+                _key = self.cache.key(self.__action, _task)
+
+            if self.__journal:
+                _journal_key = self.__journal.key(self.__action, _task)
+                if _journal_key is None and not self.__nb_keyless:
+                    log_msg = 'master - task {} cannot be pickled; '.format(
+                        positions[j])
+                    log_msg += 'its result (and those of any such task) '
+                    log_msg += 'will not be journaled.'
+                    logger.warning(log_msg)
+                if _journal_key is None:
+                    self.__nb_keyless += 1
+
+            if positions[j] in _journaled:
+                (_journaled_key, _journaled_result) = _journaled.pop(
+                    positions[j])
+                if _journal_key is not None and _journal_key == _journaled_key:
+                    (_hit, _result) = (True, _journaled_result)
+                    self.stats.resumed += 1
+                else:
+                    # journaled for some other task (or action); the tasks
+                    # have changed since.
+                    self.stats.stale += 1
+
+            if self.cache and not _hit:
+                if _key is not None:
+                    (_hit, _result) = self.cache.get(_key)
+
+                if _hit:
+                    self.stats.cache_hits += 1
+                else:
+                    self.stats.cache_misses += 1
+
+            if not _pieces or (_pieces[-1][3] is not None) != _hit:
+                _pieces.append(([], [], [], [] if _hit else None, []))
+
+            _pieces[-1][0].append(_task)
+            _pieces[-1][1].append(_key)
+            _pieces[-1][2].append(_journal_key)
+            if _hit:
+                _pieces[-1][3].append(_result)
+            _pieces[-1][4].append(positions[j])
+
+        return _pieces
+
+    def __feed(self, item, queues):
+        """
+        Put an item on one of (bounded) task queues.
+          - The first queue with room for it; in order of preference.
+          - Blocks until there is room; unless the master is done with the run.
+
+        :param item: (<run id>, <index of chunk>, <chunk of tasks>, <time
+                     fed>); or a poison pill; (<run id>, None, None, None)
+        :type item: tuple
+        :param queues: task queues; in order of preference
+        :type queues: list of multiprocessing.Queue
+        :return: whether the item was fed
+        :rtype: bool
+        """
+        while True:
+            for _queue in queues[:-1]:
+                try:
+                    _queue.put(item, block=False)
+                    return True
+                except Queue.Full:
+                    pass
+
+            try:
+                queues[-1].put(item, block=True, timeout=self.poll_interval)
+                return True
+            except Queue.Full:
+                if self.__wound_up.is_set():
+                    return False
+
+    def __run_workers(self):
+        """
+        Fire off workers to work on tasks.
+
+        :return: None
+        :rtype: None
+        """
+        # light the fuse.
+        self.__fire = True
+
+        if self.__nb_workers() < self.parallelism:
+            log_msg = 'Fewer tasks than parallelism; spawning fewer workers.'
+            logger.info(log_msg)
+
+        if self.scheduler == 'stealing':
+            # every worker must know the queues of all its peers at birth.
+            self.__queues = [self.backend.Queue(maxsize=self.prefetch)
+                             for i in range(self.__nb_workers())]
+
+        for i in range(self.__nb_workers()):
+            log_msg = 'Starting worker {}'.format(i)
+            logger.debug(log_msg)
+            self.__spawn()
+
+        log_msg = 'Initialized {} workers.'.format(len(self.__workers))
+        logger.info(log_msg)
+
+    def __spawn(self, index=None):
+        """
+        Fire off a worker; along with its inbox (if persistent) and channel.
+          - The master lets go of the writing end of the channel as soon as the
+            worker is started; so the channel of a worker that dies reads EOF.
+          - When stealing, the worker takes the next queue of its own in line.
+          - A worker spawned in place of another takes over its place in the
+            pool (and its queue).
+
+        :param index: place in the pool of the worker to replace; if any
+        :type index: int
+        :return: None
+        :rtype: None
+        """
+        _name = 'worker_%s' % self.__nb_spawned
+        self.__nb_spawned += 1
+
+        _inbox = self.backend.Queue() if self.persistent else None
+        (_channel, _outlet) = self.backend.Pipe()
+        _cursor = self.backend.Array('l', 3)
+        _cursor[0] = -1
+
+        if self.scheduler == 'stealing':
+            _queue = self.__queues[len(self.__workers) if index is None
+                                   else index]
+        else:
+            _queue = None
+
+        _worker = self.backend.Worker(target=self.__enslave,
+                                      args=(_inbox, _outlet, _cursor,
+                                            _queue),
+                                      name=_name)
+        _worker.start()
+        _outlet.close()
+
+        if index is not None:
+            self.__workers[index] = _worker
+            self.__channels[index] = _channel
+            self.__cursors[index] = _cursor
+            if _inbox:
+                self.__inboxes[index] = _inbox
+            return
+
+        self.__workers.append(_worker)
+        self.__channels.append(_channel)
+        self.__cursors.append(_cursor)
+        if _inbox:
+            self.__inboxes.append(_inbox)
+
+    # noinspection PyBroadException,PyUnusedLocal
+    def __enslave(self, inbox, outlet, cursor, queue):
+        """
+        A closure to condemn the action to the mundane world of multiprocessing.
+          - Owns up to being done with a run by a done marker on its channel.
+
+        :param inbox: orders for a persistent worker; None otherwise.
+        :type inbox: multiprocessing.Queue
+        :param outlet: the writing end of the channel of the worker
+        :type outlet: multiprocessing.Connection
+        :param cursor: where the worker is at; see Reactor.__cursors
+        :type cursor: multiprocessing.RawArray
+        :param queue: the task queue of its own; when stealing. None otherwise.
+        :type queue: multiprocessing.Queue
+        :return: None
+        :rtype: None
+        """
+        _worker_name = self.backend.current_name()
+        self.__local.outlet = outlet
+        self.__local.cursor = cursor
+        self.__local.tasks = self.__tasks
+        self.__local.peers = []
+        self.__local.timed_out = False
+
+        if queue is not None:
+            # peers are visited starting from the next one in line.
+            _index = self.__queues.index(queue)
+            self.__local.peers = (self.__queues[_index + 1:] +
+                                  self.__queues[:_index])
+            self.__local.tasks = queue
+
+        log_msg = 'Started {}, pid: {}, ppid: {}'.format(_worker_name,
+                                                         os.getpid(),
+                                                         os.getppid())
+        logger.info(log_msg)
+
+        if self.concurrency:
+            self.__local.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.__local.loop)
+        elif self.task_timeout:
+            signal.signal(signal.SIGALRM, self.__time_out)
+
+        try:
+            if not self.persistent:
+                # the action was inherited at birth; one run and done.
+                _stats = self.__work(_worker_name)
+                self.__own_up(_worker_name, _stats)
+                return
+
+            while True:
+                _order = inbox.get()
+
+                if _order is None:
+                    log_msg = '{} '.format(_worker_name)
+                    log_msg += 'closing.'
+                    logger.info(log_msg)
+                    return
+
+                (self.__batch_id, self.__action, self.__reducer,
+                 self.__initial) = _order
+
+                _stats = self.__work(_worker_name)
+                if self.__own_up(_worker_name, _stats):
+                    return
+
+        finally:
+            if self.concurrency:
+                asyncio.set_event_loop(None)
+                self.__local.loop.close()
+
+    def __own_up(self, worker_name, stats):
+        """
+        Hand the metrics of the worker for the run over to the master; along
+        with a done marker. Or, if an action of the worker ran out of time
+        mid-run, along with word that it makes way for a fresh worker.
+          - If folding, the partial aggregate of the worker goes first.
+
+        :param worker_name: name of the worker
+        :type worker_name: str
+        :param stats: metrics of the worker for the run
+        :type stats: Stats
+        :return: whether the worker makes way for a fresh one
+        :rtype: bool
+        """
+        if self.__reducer is not None:
+            self.__local.outlet.send((self.__batch_id, _PARTIAL,
+                                      self.__local.partial))
+
+        if not self.__local.timed_out:
+            self.__local.outlet.send((self.__batch_id, _DONE, stats))
+            return False
+
+        log_msg = '{} '.format(worker_name)
+        log_msg += 'had an action run out of time; making way for a fresh '
+        log_msg += 'worker.'
+        logger.warning(log_msg)
+
+        self.__local.outlet.send((self.__batch_id, _RECYCLED, stats))
+        return True
+
+    def __time_out(self, signum, frame):
+        """
+        Handler of the alarm signal; cuts an action short once it has run out
+        of time. The alarm goes off again every task_timeout secs until the
+        action gives up.
+
+        :param signum: the signal
+        :type signum: int
+        :param frame: the frame interrupted
+        :type frame: frame
+        :return: None
+        :rtype: None
+        """
+        self.__local.timed_out = True
+        raise TaskTimeout('action ran out of time ({} secs)'.format(
+            self.task_timeout))
+
+    def __work(self, worker_name):
+        """
+        Work on tasks of the current run until a poison pill shows up.
+          - Metrics are tallied along the way; and handed over to the master
+            along with the done marker, rather than task by task.
+          - When stealing, a worker helps its peers out with their leftovers
+            before calling it a day.
+          - A worker whose action ran out of time stops taking tasks once done
+            with its chunk; a fresh one takes over in its place.
+
+        :param worker_name: name of the worker
+        :type worker_name: str
+        :return: metrics of the worker for the run
+        :rtype: Stats
+        """
+        _worker_name = worker_name
+        _stats = Stats()
+
+        if self.__reducer is not None:
+            # a copy of its own; the reducer may well fold in place.
+            self.__local.partial = copy.deepcopy(self.__initial)
+
+        if self.concurrency:
+            self.__act_async(_worker_name, _stats)
+
+            log_msg = '{} '.format(_worker_name)
+            log_msg += 'finished all tasks.'
+            logger.info(log_msg)
+            return _stats
+
+        while True:
+            # check if we need to worry about stop signals.
+            if self.__stop_event.is_set():
+                log_msg = '{} '.format(_worker_name)
+                log_msg += 'got a stop signal; stopping actions.'
+                logger.warning(log_msg)
+
+                # prevent deadlocks
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_msg = '{} '.format(_worker_name)
+                    log_msg += 'flushing tasks.'
+                    logger.debug(log_msg)
+                while True:
+                    (_batch_id, _, _chunk, _) = self.__local.tasks.get()
+                    if _batch_id == self.__batch_id and _chunk is None:
+                        # the poison pill
+                        return _stats
+
+            # actions on tasks
+            if logger.isEnabledFor(logging.DEBUG):
+                log_msg = '{} '.format(_worker_name)
+                log_msg += 'fetching tasks.'
                 logger.debug(log_msg)
-                self.final_results.append(_result)
 
-            except Queue.Empty:
-                # done with all tasks
-                log_msg = 'master - finished fetching all results.'
+            _idle_since = time.time()
+            (_batch_id, _index, _chunk, _fed_at) = self.__take()
+            _stats.idle += time.time() - _idle_since
+
+            if _batch_id != self.__batch_id:
+                # a leftover from an aborted run.
+                continue
+
+            if _chunk is None:
+                # the poison pill
+                while (self.__local.peers and
+                       not self.__stop_event.is_set()):
+                    _item = self.__steal()
+                    if _item is None:
+                        break
+                    self.__act(_worker_name, _stats, *_item[1:])
+
+                # done with the run anyway; nothing to make way for.
+                self.__local.timed_out = False
+
+                log_msg = '{} '.format(_worker_name)
+                log_msg += 'finished all tasks.'
                 logger.info(log_msg)
+                return _stats
+
+            self.__act(_worker_name, _stats, _index, _chunk, _fed_at)
+            if self.__local.timed_out:
+                return _stats
+
+    def __take(self):
+        """
+        Take the next item off the task queue of the worker.
+          - When stealing, a worker whose queue stays dry for poll_interval
+            secs takes chunks off the queues of its peers meanwhile.
 
+        :return: (<run id>, <index of chunk>, <chunk of tasks>, <time fed>); or
+                 a poison pill
+        :rtype: tuple
+        """
+        if not self.__local.peers:
+            return self.__local.tasks.get()
+
+        while True:
+            # the master is likely to catch up soon; stealing is for when it
+            # does not.
+            try:
+                return self.__local.tasks.get(block=True,
+                                              timeout=self.poll_interval)
+            except Queue.Empty:
+                pass
+
+            _item = self.__steal()
+            if _item is not None:
+                return _item
+
+    def __steal(self):
+        """
+        Take a chunk of tasks off the queue of a peer; if any.
+          - Never blocks; a queue that is busy is as good as empty.
+          - Leftovers of an aborted run are dropped on the way.
+          - A poison pill is not for the taking; it is put back, and there is
+            nothing behind it.
+
+        :return: (<run id>, <index of chunk>, <chunk of tasks>, <time fed>); or
+                 None
+        :rtype: tuple
+        """
+        for _queue in self.__local.peers:
+            while True:
+                try:
+                    _item = _queue.get(block=False)
+                except Queue.Empty:
+                    break
+
+                if _item[0] != self.__batch_id:
+                    continue
+
+                if _item[2] is None:
+                    _queue.put(_item)
+                    break
+
+                return _item
+
+        return None
+
+    # noinspection PyBroadException
+    def __act(self, worker_name, stats, index, chunk, fed_at):
+        """
+        Carry out the action on a chunk of tasks; and send back the results.
+
+        :param worker_name: name of the worker
+        :type worker_name: str
+        :param stats: metrics of the worker for the run
+        :type stats: Stats
+        :param index: index of the chunk
+        :type index: int
+        :param chunk: chunk of tasks
+        :type chunk: list
+        :param fed_at: when the chunk was fed to the task queue (secs since
+                       epoch)
+        :type fed_at: float
+        :return: None
+        :rtype: None
+        """
+        _worker_name = worker_name
+        _stats = stats
+
+        # should the worker die, the master knows which task it died on.
+        _cursor = self.__local.cursor
+        _cursor[1] = len(chunk)
+        _cursor[0] = index
+
+        if self.elastic:
+            _wall_time = time.time()
+            _cpu_time = sum(os.times()[:2])
+
+        _results = []
+        _failed = []
+        for (j, _task) in enumerate(chunk):
+            if self.__stop_event.is_set():
+                # the rest of the chunk is moot.
                 break
+
+            _cursor[2] = j
+
+            _start_time = time.time()
+            _stats.queue_wait.add(_start_time - fed_at)
+
+            try:
+                if self.transport:
+                    _task = self.transport.unpack(_task)
+                if self.on_task_start:
+                    self.on_task_start(_task)
+
+                if not self.task_timeout:
+                    _result = self.__action(_task)
+                else:
+                    signal.setitimer(signal.ITIMER_REAL, self.task_timeout,
+                                     self.task_timeout)
+                    try:
+                        _result = self.__action(_task)
+                    finally:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+
+            except Exception as e:
+                self.__signal_error(_worker_name, e)
+                _stats.errors += 1
+                _failed.append(j)
+                _result = None
+
+            _duration = time.time() - _start_time
+            _stats.execution.add(_duration)
+            _stats.tasks += 1
+
+            try:
+                if self.on_task_done:
+                    self.on_task_done(_task, _result, _duration)
+                if self.__reducer is not None:
+                    if not _failed or _failed[-1] != j:
+                        self.__local.partial = self.__reducer(
+                            self.__local.partial, _result)
+                    _result = None
+                elif self.transport:
+                    _result = self.transport.pack(_result)
+
+            except Exception as e:
+                self.__signal_error(_worker_name, e)
+                _stats.errors += 1
+                _failed.append(j)
+                _result = None
+
+            _results.append(_result)
+
+        if self.elastic:
+            _load = (time.time() - _wall_time,
+                     sum(os.times()[:2]) - _cpu_time)
+        else:
+            _load = None
+
+        _cursor[0] = -1
+
+        if self.__reducer is not None:
+            if not _load:
+                # folded; nothing to send.
+                return
+            # just the load; for the master to adapt the pool by.
+            (_results, _failed) = ([], [])
+
+        self.__local.outlet.send((self.__batch_id, _RESULTS,
+                                  (index, _results, _failed, time.time(),
+                                   _load)))
+
+    # noinspection PyBroadException
+    def __act_async(self, worker_name, stats):
+        """
+        Carry out the (coroutine) action on tasks of the current run
+        concurrently; on the event loop of the worker. Until a poison pill
+        shows up.
+          - Up to concurrency tasks are awaited at once; a chunk is taken off
+            the task queue (in a thread of the loop, so that the loop goes on
+            meanwhile) as soon as there is room.
+          - The results of a chunk are sent back as soon as all its tasks are
+            done.
+          - Outstanding actions are cancelled on a stop signal; and chunks
+            are flushed off the task queue up to the poison pill.
+
+        :param worker_name: name of the worker
+        :type worker_name: str
+        :param stats: metrics of the worker for the run
+        :type stats: Stats
+        :return: None
+        :rtype: None
+        """
+        _loop = self.__local.loop
+        # the loop takes chunks in a thread of its own; not privy to
+        # self.__local.
+        _tasks = self.__local.tasks
+
+        # actions outstanding; nb of tasks awaited at once
+        _futures = set()
+        # [<chunk being taken; if any>, <whether the poison pill showed up>,
+        #  <waiting on the task queue since; if idle>]
+        _taking = [None, False, None]
+        # done once the poison pill showed up and all actions are done
+        _done = _loop.create_future()
+
+        def _refill():
+            _stopping = self.__stop_event.is_set()
+            if (_taking[0] is None and not _taking[1] and
+                    (_stopping or len(_futures) < self.concurrency)):
+                if not _futures:
+                    _taking[2] = time.time()
+                _taking[0] = _loop.run_in_executor(None, _tasks.get)
+                _taking[0].add_done_callback(_taken)
+
+            if _taking[1] and not _futures and not _done.done():
+                _done.set_result(None)
+
+        def _taken(taking):
+            _taking[0] = None
+            if _taking[2] is not None:
+                stats.idle += time.time() - _taking[2]
+                _taking[2] = None
+
+            if taking.exception() is not None:
+                # the task queue is gone; so is the worker.
+                _done.set_exception(taking.exception())
+                return
+
+            (_batch_id, _index, _chunk, _fed_at) = taking.result()
+
+            if _batch_id != self.__batch_id:
+                # a leftover from an aborted run.
+                pass
+            elif _chunk is None:
+                # the poison pill; once the actions outstanding are done.
+                _taking[1] = True
+            elif not self.__stop_event.is_set():
+                _start(_index, _chunk, _fed_at)
+
+            _refill()
+
+        def _start(index, chunk, fed_at):
+            _results = [None] * len(chunk)
+            _failed = []
+            _left = [len(chunk)]
+
+            def _finish(future):
+                _futures.discard(future)
+                _left[0] -= 1
+                if not _left[0] and self.__reducer is None:
+                    self.__local.outlet.send(
+                        (self.__batch_id, _RESULTS,
+                         (index, _results, _failed, time.time(), None)))
+                _refill()
+
+            for (j, _task) in enumerate(chunk):
+                _start_time = time.time()
+                stats.queue_wait.add(_start_time - fed_at)
+
+                try:
+                    if self.transport:
+                        _task = self.transport.unpack(_task)
+                    if self.on_task_start:
+                        self.on_task_start(_task)
+                    _awaitable = self.__action(_task)
+                    if self.task_timeout:
+                        _awaitable = asyncio.wait_for(_awaitable,
+                                                      self.task_timeout)
+                    _future = asyncio.ensure_future(_awaitable, loop=_loop)
+
+                except Exception as e:
+                    # not even an awaitable; an error of the task all the
+                    # same.
+                    _future = _loop.create_future()
+                    _future.set_exception(e)
+
+                # in this order; the result is in before the chunk is done.
+                _future.add_done_callback(functools.partial(
+                    self.__acted, worker_name, stats, _results, _failed, j,
+                    _task, _start_time))
+                _future.add_done_callback(_finish)
+                _futures.add(_future)
+
+        def _watch():
+            if self.__stop_event.is_set():
+                for _future in list(_futures):
+                    _future.cancel()
+            _watcher[0] = _loop.call_later(self.poll_interval, _watch)
+
+        _watcher = [_loop.call_later(self.poll_interval, _watch)]
+        _loop.call_soon(_refill)
+        try:
+            _loop.run_until_complete(_done)
+        finally:
+            _watcher[0].cancel()
+
+    # noinspection PyBroadException
+    def __acted(self, worker_name, stats, results, failed, j, task,
+                start_time, future):
+        """
+        Gather the result of a (coroutine) action; the callback of its future.
+
+        :param worker_name: name of the worker
+        :type worker_name: str
+        :param stats: metrics of the worker for the run
+        :type stats: Stats
+        :param results: results of the chunk of the task
+        :type results: list
+        :param failed: positions of the tasks of the chunk that failed
+        :type failed: list
+        :param j: index of the task in its chunk
+        :type j: int
+        :param task: the task
+        :type task: object
+        :param start_time: when the action started (secs since epoch)
+        :type start_time: float
+        :param future: the (done) action
+        :type future: asyncio.Future
+        :return: None
+        :rtype: None
+        """
+        if future.cancelled():
+            # cancelled on a stop signal; moot.
+            return
+
+        _duration = time.time() - start_time
+        stats.execution.add(_duration)
+        stats.tasks += 1
+
+        _result = None
+        _e = future.exception()
+        if self.task_timeout and isinstance(_e, asyncio.TimeoutError):
+            # ran out of time; as reported for plain actions.
+            _e = TaskTimeout('action ran out of time ({} secs)'.format(
+                self.task_timeout))
+        if _e is not None:
+            self.__signal_error(worker_name, _e,
+                                (type(_e), _e, _e.__traceback__))
+            stats.errors += 1
+            failed.append(j)
+        else:
+            _result = future.result()
+
+        try:
+            if self.on_task_done:
+                self.on_task_done(task, _result, _duration)
+            if self.__reducer is not None:
+                if _e is None:
+                    self.__local.partial = self.__reducer(
+                        self.__local.partial, _result)
+                _result = None
+            elif self.transport:
+                _result = self.transport.pack(_result)
+
+        except Exception as e:
+            self.__signal_error(worker_name, e)
+            stats.errors += 1
+            failed.append(j)
+            _result = None
+
+        results[j] = _result
+
+    def __signal_error(self, worker_name, e, exc_info=None):
+        """
+        Signal an exception on a task to the master; right away, so that the
+        master notices it without waiting for the rest of the chunk.
+          - To be called from within the except clause; unless exc_info is
+            given.
+
+        :param worker_name: name of the worker
+        :type worker_name: str
+        :param e: the exception
+        :type e: Exception
+        :param exc_info: (<type>, <exception>, <traceback>); of the except
+                         clause by default.
+        :type exc_info: tuple
+        :return: None
+        :rtype: None
+        """
+        if logger.isEnabledFor(logging.ERROR):
+            log_msg = '{} '.format(worker_name)
+            log_msg += 'has had an exception. Signaling the '
+            log_msg += 'master. Exception details: {}'.format(
+                e.args[0] if e.args else repr(e))
+            logger.error(log_msg)
+
+        self.__local.outlet.send(
+            (self.__batch_id, _ERROR,
+             "".join(traceback.format_exception(*(exc_info or
+                                                  sys.exc_info())))))
+
+    def __fetch_results(self):
+        """
+        Process results from the slave worker.
+          - Yield chunks of results as they arrive; along with the index of
+            their chunk.
+          - Will take care of stopping other workers if one of them had signaled
+            an error.
+          - Done once every worker has owned up to being done with the run; or
+            has died.
+             - A worker that dies without a done marker is an error; its
+               channel reads EOF.
+             - If workers stay silent for result_timeout secs, then assume that
+               all processing is completed.
+
+        :return: iterator over (<index of chunk>, <list of results>); and
+                 None once, as soon as the run has failed in stop-on-error
+                 mode.
+        :rtype: generator
+        """
+        # workers yet to be done with the run; by their channel
+        _pending = dict(zip(self.__channels, self.__workers))
+
+        _last_seen = time.time()
+        _adapted_at = time.time()
+        _failed = False
+        while _pending:
+            if self.error and self.stop_on_error and not _failed:
+                # the run has failed; the caller may give up on it now.
+                _failed = True
+                yield None
+
+            while self.__answered:
+                # answered by the cache; nothing to wait on.
+                _last_seen = time.time()
+                _answer = self.__answered.popleft()
+                if not (self.error and self.stop_on_error):
+                    yield _answer
+
+            if (self.elastic and
+                    time.time() - _adapted_at > self.elastic_interval):
+                self.__adapt(_pending)
+                _adapted_at = time.time()
+
+            if self.__stopped_at is not None and self.grace_period is not None:
+                self.__hard_stop(_pending)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                log_msg = 'master - fetching results '
+                log_msg += '(will block for {} secs)'.format(
+                    self.poll_interval)
+                logger.debug(log_msg)
+
+            _blocked_since = time.time()
+            _ready = self.backend.wait(list(_pending), self.poll_interval)
+            self.stats.blocked += time.time() - _blocked_since
+
+            if not _ready:
+                # a safety net; for workers that died with no EOF to show.
+                for (_channel, _worker) in list(_pending.items()):
+                    if not _worker.is_alive() and not _channel.poll():
+                        _lost = self.__bury(_pending.pop(_channel), _pending)
+                        if _lost and not (self.error and self.stop_on_error):
+                            for _placed in self.__forfeit(*_lost):
+                                yield _placed
+
+                if time.time() - _last_seen > self.result_timeout:
+                    log_msg = 'master - no word from workers for {} secs; '
+                    log_msg += 'finished fetching all results.'
+                    logger.warning(log_msg.format(self.result_timeout))
+                    break
+
+                continue
+
+            _last_seen = time.time()
+
+            for _channel in _ready:
+                try:
+                    (_batch_id, _kind, _payload) = _channel.recv()
+                except (EOFError, IOError):
+                    # the worker is gone without owning up to being done.
+                    _lost = self.__bury(_pending.pop(_channel), _pending)
+                    if _lost and not (self.error and self.stop_on_error):
+                        for _placed in self.__forfeit(*_lost):
+                            yield _placed
+                    continue
+
+                if _batch_id != self.__batch_id:
+                    # a leftover from an aborted run.
+                    continue
+
+                if _kind == _DONE:
+                    _worker = _pending.pop(_channel)
+                    self.stats.merge(_worker.name, _payload)
+                    continue
+
+                if _kind == _RECYCLED:
+                    _worker = _pending.pop(_channel)
+                    self.stats.merge(_worker.name, _payload)
+                    _fresh = self.__replace(_worker, _pending)
+
+                    log_msg = 'master - {} made way for {} after an action '
+                    log_msg += 'ran out of time.'
+                    logger.info(log_msg.format(_worker.name, _fresh.name))
+                    continue
+
+                if _kind == _ERROR:
+                    if self.stop_on_error and not self.error:
+                        self.__signal_stop(_payload)
+                    continue
+
+                if self.error and self.stop_on_error:
+                    # the run is moot; just let the workers account for
+                    # themselves.
+                    continue
+
+                if _kind == _PARTIAL:
+                    self.__combine(_payload)
+                    continue
+
+                (_index, _results, _failed, _sent_at, _load) = _payload
+                self.stats.transfer.add(time.time() - _sent_at)
+
+                if _load:
+                    self.__load[0] += _load[0]
+                    self.__load[1] += _load[1]
+
+                if self.transport:
+                    _results = [self.transport.unpack(_result)
+                                for _result in _results]
+
+                if self.cache or self.__journal:
+                    (_keys, _journal_keys) = self.__keys.pop(_index)
+
+                if self.cache:
+                    self.__remember(_keys, _results, _failed)
+
+                if self.__journal:
+                    self.__journal.record(
+                        self.__positions.get(_index) or
+                        range(_index, _index + len(_results)),
+                        _journal_keys, _results, _failed)
+
+                if self.correlate_tasks_to_results:
+                    # rejoin results with the tasks we held on to.
+                    _results = list(zip(self.__in_flight.pop(_index),
+                                        _results))
+
+                # pretty printing results costs more than many an action; only
+                # pay for it if somebody is listening.
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_msg = 'master - got results {}'.format(
+                        pprint.pformat(_results))
+                    logger.debug(log_msg)
+
+                for _placed in self.__place(_index, _results):
+                    yield _placed
+
+        while self.__answered:
+            _answer = self.__answered.popleft()
+            if not (self.error and self.stop_on_error):
+                yield _answer
+
+        log_msg = 'master - finished fetching all results.'
+        logger.info(log_msg)
+
+    # noinspection PyBroadException
+    def __combine(self, partial):
+        """
+        Combine the partial aggregate of a worker into the aggregate of the
+        run.
+          - A combiner that fails is an error of the run; the aggregate is
+            incomplete, and run raises Error whatever stop_on_error.
+
+        :param partial: the partial aggregate of the worker
+        :type partial: object
+        :return: None
+        :rtype: None
+        """
+        try:
+            self.__aggregate = self.__combiner(self.__aggregate, partial)
+
+        except Exception:
+            _error = ''.join(traceback.format_exception(*sys.exc_info()))
+
+            log_msg = 'master - failed to combine a partial aggregate: '
+            log_msg += '{}'.format(_error)
+            logger.error(log_msg)
+
+            if self.__aggregate_error is None:
+                self.__aggregate_error = _error
+
+            if self.stop_on_error and not self.error:
+                self.__signal_stop(_error)
+
+    def __remember(self, keys, results, failed):
+        """
+        Have the cache remember the results of a chunk; but those of tasks
+        that failed.
+
+        :param keys: cache keys of the tasks of the chunk
+        :type keys: list
+        :param results: results of the chunk
+        :type results: list
+        :param failed: positions of the tasks of the chunk that failed
+        :type failed: list
+        :return: None
+        :rtype: None
+        """
+        for (j, (_key, _result)) in enumerate(zip(keys, results)):
+            if _key is not None and j not in failed:
+                self.cache.set(_key, _result)
+
+    def __adapt(self, pending):
+        """
+        Grow or shrink the pool of workers; from the load observed since the
+        last decision (elastic mode).
+          - The share of CPU time in the time taken by actions is the share of
+            a CPU kept busy by a worker.
+          - Shrinks by a worker if there are more workers than CPUs and they
+            keep the CPUs busy; more workers just take turns on the CPUs.
+          - Grows by a worker if tasks back up in the task queue and there is
+            room on the CPUs for one more worker; I/O bound actions leave
+            plenty.
+          - A worker is retired by an extra poison pill; in persistent mode, it
+            sits out the rest of the run. A worker added in persistent mode
+            stays in the pool.
+
+        :param pending: workers yet to be done with the run; by their channel
+        :type pending: dict
+        :return: None
+        :rtype: None
+        """
+        (_wall_time, _cpu_time) = self.__load
+        if not _wall_time:
+            # nothing to go by.
+            return
+        self.__load = [0.0, 0.0]
+
+        _share = min(_cpu_time / _wall_time, 1.0)
+        _cpus = cpu_count()
+        _busy_cpus = self.__nb_active * _share
+
+        with self.__pool_lock:
+            if self.__fed_pills or self.__stop_event.is_set():
+                return
+
+            if (self.__nb_active > _cpus and self.__nb_active > 1 and
+                    _busy_cpus >= 0.9 * _cpus):
+                try:
+                    self.__tasks.put((self.__batch_id, None, None, None),
+                                     block=False)
+                except Queue.Full:
+                    return
+
+                self.__nb_retired += 1
+                self.__nb_active -= 1
+
+                log_msg = 'master - {} workers keep {} CPUs busy; '.format(
+                    self.__nb_active + 1, _cpus)
+                log_msg += 'retiring a worker.'
+                logger.info(log_msg)
+
+            elif (self.__nb_active < self.max_parallelism and
+                  _busy_cpus + _share <= _cpus and self.__backlogged()):
+                self.__spawn()
+                if self.persistent:
+                    self.__inboxes[-1].put(self.__order())
+
+                pending[self.__channels[-1]] = self.__workers[-1]
+                self.__nb_active += 1
+
+                log_msg = 'master - tasks back up with {} '.format(
+                    self.__nb_active - 1)
+                log_msg += 'workers keeping {:.2f} CPUs busy; '.format(
+                    _busy_cpus)
+                log_msg += 'adding a worker.'
+                logger.info(log_msg)
+
+    def __replace(self, worker, pending):
+        """
+        Replace a worker that is gone mid-run with a fresh one; eg. one that
+        made way after an action ran out of time, or one that died.
+          - The fresh worker takes over its place in the pool; and the poison
+            pill it has left behind.
+
+        :param worker: the worker that is gone
+        :type worker: multiprocessing.Process
+        :param pending: workers yet to be done with the run; by their channel
+        :type pending: dict
+        :return: the fresh worker
+        :rtype: multiprocessing.Process
+        """
+        worker.join()
+
+        _index = self.__workers.index(worker)
+        self.__channels[_index].close()
+        if self.persistent:
+            self.__inboxes[_index].close()
+
+        self.__spawn(_index)
+        if self.persistent:
+            self.__inboxes[_index].put(self.__order())
+
+        pending[self.__channels[_index]] = self.__workers[_index]
+
+        return self.__workers[_index]
+
+    def __forfeit(self, index, size):
+        """
+        Results of a chunk lost along with its worker; all None.
+
+        :param index: index of the chunk
+        :type index: int
+        :param size: nb of tasks in the chunk
+        :type size: int
+        :return: [(<index of first task>, <list of results>)]; see __place
+        :rtype: list
+        """
+        _results = [None] * size
+        self.__keys.pop(index, None)
+
+        if self.correlate_tasks_to_results:
+            _results = list(zip(self.__in_flight.pop(index), _results))
+
+        return self.__place(index, _results)
+
+    def __place(self, index, results):
+        """
+        Where the results of a chunk go in the results of the run.
+          - Tasks of a chunk are in a row in the tasks given; unless
+            prioritizing, in which case results are split into runs of tasks
+            in a row.
+
+        :param index: index of the chunk
+        :type index: int
+        :param results: results of the chunk
+        :type results: list
+        :return: [(<index of first task>, <list of results>)]
+        :rtype: list
+        """
+        _positions = self.__positions.pop(index, None)
+        if _positions is None:
+            return [(index, results)]
+
+        _runs = []
+        for (_position, _result) in zip(_positions, results):
+            if _runs and _runs[-1][0] + len(_runs[-1][1]) == _position:
+                _runs[-1][1].append(_result)
+            else:
+                _runs.append((_position, [_result]))
+
+        return _runs
+
+    def __hard_stop(self, pending):
+        """
+        Terminate workers still busy grace_period secs after the stop signal;
+        and kill those that outlive their termination by as long again.
+
+        :param pending: workers yet to be done with the run; by their channel
+        :type pending: dict
+        :return: None
+        :rtype: None
+        """
+        _now = time.time()
+        if _now - self.__stopped_at < self.grace_period:
+            return
+
+        for _worker in pending.values():
+            if _worker not in self.__terminated:
+                log_msg = 'master - terminating {} (pid: {}); '.format(
+                    _worker.name, _worker.pid)
+                log_msg += 'still busy {} secs after the stop signal.'.format(
+                    self.grace_period)
+                logger.warning(log_msg)
+
+                _worker.terminate()
+                self.__terminated[_worker] = _now
+
+            elif _now - self.__terminated[_worker] > self.grace_period:
+                log_msg = 'master - killing {} (pid: {}); '.format(
+                    _worker.name, _worker.pid)
+                log_msg += 'still alive {} secs after termination.'.format(
+                    self.grace_period)
+                logger.warning(log_msg)
+
+                try:
+                    os.kill(_worker.pid, signal.SIGKILL)
+                except OSError:
+                    # gone meanwhile
+                    pass
+                self.__terminated[_worker] = _now
+
+    def __backlogged(self):
+        """
+        Whether tasks back up in the task queue; ie. there are at least as many
+        chunks waiting as there are workers.
+
+        :return: True if tasks back up
+        :rtype: bool
+        """
+        try:
+            return self.__tasks.qsize() >= self.__nb_active
+        except NotImplementedError:
+            # no qsize() on some platforms (eg. Mac OS X)
+            return self.__tasks.full()
+
+    def __bury(self, worker, pending):
+        """
+        Account for a worker that died without being done with the run.
+          - The task it died on is an error; signaled in stop-on-error mode.
+            Unless it was terminated on a hard stop.
+          - Replaced by a fresh worker; up to max_respawns times a run, and
+            unless workers are signaled to stop.
+          - Else, a dead persistent worker is dropped from the pool.
+
+        :param worker: the dead worker
+        :type worker: multiprocessing.Process
+        :param pending: workers yet to be done with the run; by their channel
+        :type pending: dict
+        :return: (<index of chunk>, <size of chunk>) of the chunk lost along
+                 with the worker; if any
+        :rtype: tuple
+        """
+        # reap it; a dead worker's channel may read EOF a tad before it exits.
+        worker.join()
+
+        _index = self.__workers.index(worker)
+        _cursor = self.__cursors[_index]
+        _lost = None
+
+        if worker in self.__terminated:
+            log_msg = 'master - {} (pid: {}) terminated; '.format(
+                worker.name, worker.pid)
+            log_msg += 'exit code: {}'.format(worker.exitcode)
+            logger.info(log_msg)
+
+        else:
+            if _cursor[0] >= 0:
+                _lost = (_cursor[0], _cursor[1])
+                _position = _cursor[0] + _cursor[2]
+                if _cursor[0] in self.__positions:
+                    _position = self.__positions[_cursor[0]][_cursor[2]]
+                _error = '{} (pid: {}) died unexpectedly on task {}; '.format(
+                    worker.name, worker.pid, _position)
+                self.stats.errors += 1
+            else:
+                _error = '{} (pid: {}) died unexpectedly; '.format(
+                    worker.name, worker.pid)
+            _error += 'exit code: {}'.format(worker.exitcode)
+            if self.__reducer is not None:
+                _error += '; its partial aggregate is lost'
+                if self.__aggregate_error is None:
+                    self.__aggregate_error = _error
+            logger.error('master - {}'.format(_error))
+
+            if self.stop_on_error and not self.error:
+                self.__signal_stop(_error)
+
+            if (not self.__stop_event.is_set() and
+                    self.__nb_respawned < self.max_respawns):
+                self.__nb_respawned += 1
+                _fresh = self.__replace(worker, pending)
+
+                log_msg = 'master - {} takes over from {} '.format(
+                    _fresh.name, worker.name)
+                log_msg += '({} of {} respawns).'.format(
+                    self.__nb_respawned, self.max_respawns)
+                logger.warning(log_msg)
+                return _lost
+
+        self.__nb_active -= 1
+
+        if self.__queues:
+            # whatever is left in its queue is never to be taken; do not wait
+            # on it when closing.
+            self.__queues[_index].cancel_join_thread()
+
+        if self.persistent:
+            del self.__workers[_index]
+            del self.__cursors[_index]
+            self.__channels.pop(_index).close()
+            self.__inboxes.pop(_index).close()
+            if self.__queues:
+                self.__queues.pop(_index).close()
+
+    def __signal_stop(self, error):
+        """
+        Record an error and signal all workers to stop.
+
+        :param error: error info (traceback) signaled by a worker
+        :type error: str
+        :return: None
+        :rtype: None
+        """
+        # some worker has had an error; raise the stop signal
+        log_msg = 'master - worker signaled an exception'
+        log_msg += 'error info: {}'.format(error)
+        logger.error(log_msg)
+
+        log_msg = 'signaling error to other workers.'
+        logger.warning(log_msg)
+
+        self.__stop_event.set()
+        if self.__stopped_at is None:
+            self.__stopped_at = time.time()
+
+        self.error = error
+
+
+class Timing(object):
+    """
+    A tally of timings (secs); kept cheap enough to be updated on every task.
+
+    :var.count: nb of timings
+    :var.total: sum of timings (secs)
+    :var.max: longest timing (secs)
+    """
+
+    def __init__(self):
+        """
+        Initializer.
+
+        :return: None
+        :rtype: None
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self):
+        """
+        Mean of timings (secs); 0 if there are none.
+
+        :rtype: float
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, value):
+        """
+        Tally a timing.
+
+        :param value: a timing (secs)
+        :type value: float
+        :return: None
+        :rtype: None
+        """
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Fold another tally in.
+
+        :param other: another tally
+        :type other: Timing
+        :return: None
+        :rtype: None
+        """
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def as_dict(self):
+        """
+        :return: count, total, mean and max
+        :rtype: dict
+        """
+        return {'count': self.count, 'total': self.total, 'mean': self.mean,
+                'max': self.max}
+
+
+class Stats(object):
+    """
+    Metrics of a run; of the reactor as a whole or of one of its workers.
+
+    :var.tasks: nb of tasks acted upon (failed ones included)
+    :var.errors: nb of exceptions on tasks
+    :var.queue_wait: from tasks being fed to the task queue to their action
+                     starting
+    :var.execution: actions (and on_task_start hooks)
+    :var.transfer: chunks of results; from being sent by a worker to being
+                   received by the master
+    :var.idle: time spent by workers waiting on the task queue (secs)
+    :var.blocked: time spent by the master waiting on workers (secs)
+    :var.duration: duration of the run (secs)
+    :var.cache_hits: nb of tasks answered by the cache
+    :var.cache_misses: nb of tasks looked up in the cache in vain
+    :var.resumed: nb of tasks answered by the journal of a previous run
+    :var.stale: nb of journaled results left out; they were journaled for
+                other tasks (or another action)
+    :var.workers: metrics of each worker; by name
+
+    Workers tally their own metrics and hand them over along with their done
+    marker; metrics of a worker that died are lost.
+    """
+
+    def __init__(self):
+        """
+        Initializer.
+
+        :return: None
+        :rtype: None
+        """
+        self.tasks = 0
+        self.errors = 0
+        self.queue_wait = Timing()
+        self.execution = Timing()
+        self.transfer = Timing()
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.duration = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.resumed = 0
+        self.stale = 0
+        self.workers = {}
+
+    @property
+    def busy(self):
+        """
+        Time spent by workers on actions (secs).
+
+        :rtype: float
+        """
+        return self.execution.total
+
+    def merge(self, name, worker_stats):
+        """
+        Fold the metrics of a worker in.
+
+        :param name: name of the worker
+        :type name: str
+        :param worker_stats: metrics of the worker
+        :type worker_stats: Stats
+        :return: None
+        :rtype: None
+        """
+        self.workers[name] = worker_stats
+        self.tasks += worker_stats.tasks
+        self.errors += worker_stats.errors
+        self.queue_wait.merge(worker_stats.queue_wait)
+        self.execution.merge(worker_stats.execution)
+        self.idle += worker_stats.idle
+
+    def as_dict(self):
+        """
+        :return: metrics; as plain (eg. JSON serializable) data
+        :rtype: dict
+        """
+        return {
+            'tasks': self.tasks,
+            'errors': self.errors,
+            'queue_wait': self.queue_wait.as_dict(),
+            'execution': self.execution.as_dict(),
+            'transfer': self.transfer.as_dict(),
+            'busy': self.busy,
+            'idle': self.idle,
+            'blocked': self.blocked,
+            'duration': self.duration,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'resumed': self.resumed,
+            'stale': self.stale,
+            'workers': dict((_name, _worker.as_dict()) for
+                            (_name, _worker) in self.workers.items()),
+        }
+
+    def __repr__(self):
+        return pprint.pformat(self.as_dict())
+
+
+class ProcessBackend(object):
+    """
+    Workers are processes; the default.
+      - Tasks and results are pickled on their way to and from workers.
+      - A worker that dies is noticed by its channel reading EOF.
+
+    A backend provides a worker type (with the interface of
+    multiprocessing.Process), a queue type, an event type and an array type
+    (those of multiprocessing), one-way channels; and a way to wait on
+    channels.
+    """
+    Worker = multiprocessing.Process
+    Queue = staticmethod(multiprocessing.Queue)
+    Event = staticmethod(multiprocessing.Event)
+    Array = staticmethod(multiprocessing.RawArray)
+
+    @staticmethod
+    def Pipe():
+        """
+        A one-way channel from a worker to the master.
+
+        :return: (<reading end>, <writing end>)
+        :rtype: tuple
+        """
+        return multiprocessing.Pipe(duplex=False)
+
+    @staticmethod
+    def wait(channels, timeout):
+        """
+        Wait for any of channels to have something to read (or to read EOF).
+
+        :param channels: reading ends of channels
+        :type channels: list
+        :param timeout: how long to wait at most (secs)
+        :type timeout: float
+        :return: channels ready to be read
+        :rtype: list
+        """
+        (_ready, _, _) = select.select(channels, [], [], timeout)
+        return _ready
+
+    @staticmethod
+    def current_name():
+        """
+        :return: name of the current worker
+        :rtype: str
+        """
+        return multiprocessing.current_process().name
+
+
+class _ThreadWorker(threading.Thread):
+    """
+    A thread with the bits of the interface of multiprocessing.Process that
+    the reactor relies upon.
+    """
+
+    def __init__(self, target, args, name):
+        super(_ThreadWorker, self).__init__(target=target, args=args,
+                                            name=name)
+        # nothing to keep the interpreter from exiting
+        self.daemon = True
+
+    @property
+    def pid(self):
+        return os.getpid()
+
+    @property
+    def exitcode(self):
+        return None
+
+
+class _ThreadQueue(Queue.Queue):
+    """
+    A queue with the bits of the interface of multiprocessing.Queue that the
+    reactor relies upon; there is no pipe to close nor feeder thread to join.
+    """
+
+    def close(self):
+        pass
+
+    def join_thread(self):
+        pass
+
+    def cancel_join_thread(self):
+        pass
+
+
+class _ThreadChannel(object):
+    """
+    A one-way channel between threads; both its ends in one. Messages are
+    handed over as is; rather than pickled.
+    """
+
+    def __init__(self, ready):
+        """
+        Initializer.
+
+        :param ready: notified of every message; shared by all channels
+        :type ready: threading.Condition
+        :return: None
+        :rtype: None
+        """
+        self.__ready = ready
+        self.__messages = collections.deque()
+
+    def send(self, message):
+        with self.__ready:
+            self.__messages.append(message)
+            self.__ready.notify_all()
+
+    def recv(self):
+        return self.__messages.popleft()
+
+    def poll(self):
+        return bool(self.__messages)
+
+    def close(self):
+        pass
+
+
+class ThreadBackend(object):
+    """
+    Workers are threads of the master.
+      - Cheap enough to have hundreds of them; eg. for I/O bound actions.
+      - Tasks and results are handed over as is; nothing is pickled.
+      - Actions hold the GIL while running Python code; CPU bound actions
+        gain nothing from more threads.
+      - Threads cannot be killed; a worker whose action hangs can only be
+        given up on (see result_timeout).
+    """
+    Worker = _ThreadWorker
+    Queue = _ThreadQueue
+    Event = staticmethod(threading.Event)
+
+    def __init__(self):
+        """
+        Initializer.
+
+        :return: None
+        :rtype: None
+        """
+        # notified of every message on any channel
+        self.__ready = threading.Condition()
+
+    def Pipe(self):
+        """
+        A one-way channel from a worker to the master.
+
+        :return: (<reading end>, <writing end>); one and the same
+        :rtype: tuple
+        """
+        _channel = _ThreadChannel(self.__ready)
+        return (_channel, _channel)
+
+    @staticmethod
+    def Array(typecode, size):
+        """
+        An array shared by a worker and the master.
+
+        :param typecode: type of the items; ignored
+        :type typecode: str
+        :param size: nb of items
+        :type size: int
+        :return: the array; zeroed
+        :rtype: list
+        """
+        return [0] * size
+
+    def wait(self, channels, timeout):
+        """
+        Wait for any of channels to have something to read.
+
+        :param channels: channels
+        :type channels: list
+        :param timeout: how long to wait at most (secs)
+        :type timeout: float
+        :return: channels ready to be read
+        :rtype: list
+        """
+        with self.__ready:
+            _ready = [_channel for _channel in channels if _channel.poll()]
+            if not _ready:
+                self.__ready.wait(timeout)
+                _ready = [_channel for _channel in channels
+                          if _channel.poll()]
+
+        return _ready
+
+    @staticmethod
+    def current_name():
+        """
+        :return: name of the current worker
+        :rtype: str
+        """
+        return threading.current_thread().name
+
+
+# backends by name
+BACKENDS = {'process': ProcessBackend, 'thread': ThreadBackend}
+
+
+class Segment(object):
+    """
+    A handle on a payload parked in shared memory; it travels through the
+    queues in place of the payload.
+
+    :var.path: the file backing the segment
+    :var.size: size of the payload (bytes)
+    :var.kind: type of the payload; 'bytes', 'bytearray' or 'ndarray'
+    :var.dtype: data type of an ndarray payload
+    :var.shape: shape of an ndarray payload
+    """
+
+    def __init__(self, path, size, kind, dtype=None, shape=None):
+        """
+        Initializer.
+
+        :param path: the file backing the segment
+        :type path: str
+        :param size: size of the payload (bytes)
+        :type size: int
+        :param kind: type of the payload; 'bytes', 'bytearray' or 'ndarray'
+        :type kind: str
+        :param dtype: data type of an ndarray payload
+        :type dtype: numpy.dtype
+        :param shape: shape of an ndarray payload
+        :type shape: tuple
+        :return: None
+        :rtype: None
+        """
+        self.path = path
+        self.size = size
+        self.kind = kind
+        self.dtype = dtype
+        self.shape = shape
+
+
+class SharedMemoryTransport(object):
+    """
+    Parks large payloads (tasks and results) in memory mapped segments; so that
+    only lightweight handles are pickled through the queues.
+
+    :var.threshold: payloads of at least that many bytes are parked (bytes)
+    :var.directory: where the segments live; under /dev/shm (a tmpfs) if any
+
+    Payloads that qualify are bytes (str on Python 2), bytearray and (if numpy
+    is installed) numpy arrays; as tasks or results, not nested within them.
+
+        - bytes and bytearray payloads are copied out of the segment once.
+        - numpy arrays are mapped; they are not copied at all.
+
+    Each segment is unlinked by whoever unpacks it. Whatever is left behind
+    (eg. by a run aborted on error) is swept by the reactor after every run;
+    and the lot is removed when the reactor is closed.
+    """
+    # payloads of at least that many bytes are parked (bytes)
+    threshold = 1024 * 1024
+
+    def __init__(self, threshold=threshold, directory=None):
+        """
+        Initializer.
+
+        :param threshold: payloads of at least that many bytes are parked.
+        :type threshold: int
+        :param directory: where to create the directory of segments; /dev/shm
+                          by default, if any.
+        :type directory: str
+        :return: None
+        :rtype: None
+        """
+        self.threshold = threshold
+
+        if directory is None and os.path.isdir('/dev/shm'):
+            directory = '/dev/shm'
+
+        # segments of a transport live in a directory of their own.
+        self.directory = tempfile.mkdtemp(prefix='pyreactor-', dir=directory)
+
+    def pack(self, payload):
+        """
+        Park a payload in a segment; if it qualifies.
+
+        :param payload: a task or a result
+        :type payload: object
+        :return: a handle on the segment; or the payload as is.
+        :rtype: Segment or object
+        """
+        if isinstance(payload, bytes):
+            _segment = Segment(None, len(payload), 'bytes')
+        elif isinstance(payload, bytearray):
+            _segment = Segment(None, len(payload), 'bytearray')
+        elif (numpy is not None and isinstance(payload, numpy.ndarray) and
+              not payload.dtype.hasobject):
+            _segment = Segment(None, payload.nbytes, 'ndarray',
+                               dtype=payload.dtype, shape=payload.shape)
+        else:
+            return payload
+
+        if not _segment.size or _segment.size < self.threshold:
+            return payload
+
+        (_fd, _segment.path) = tempfile.mkstemp(dir=self.directory)
+        try:
+            os.ftruncate(_fd, _segment.size)
+            _map = mmap.mmap(_fd, _segment.size)
+        finally:
+            os.close(_fd)
+
+        try:
+            if _segment.kind == 'ndarray':
+                numpy.frombuffer(_map, dtype=_segment.dtype).reshape(
+                    _segment.shape)[...] = payload
+            else:
+                _map.write(payload)
+        finally:
+            _map.close()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            log_msg = 'Parked {} bytes in {}'.format(_segment.size,
+                                                     _segment.path)
+            logger.debug(log_msg)
+
+        return _segment
+
+    def unpack(self, payload):
+        """
+        Fetch a payload out of its segment; and unlink the segment.
+
+        :param payload: a handle on a segment; or any other payload
+        :type payload: Segment or object
+        :return: the payload
+        :rtype: object
+        """
+        if not isinstance(payload, Segment):
+            return payload
+
+        with open(payload.path, 'r+b') as _file:
+            _map = mmap.mmap(_file.fileno(), payload.size)
+
+        # the mapping outlives the name.
+        os.unlink(payload.path)
+
+        if payload.kind == 'ndarray':
+            return numpy.frombuffer(_map, dtype=payload.dtype).reshape(
+                payload.shape)
+
+        try:
+            if payload.kind == 'bytearray':
+                return bytearray(_map[:])
+            return _map[:]
+        finally:
+            _map.close()
+
+    def sweep(self):
+        """
+        Remove segments left behind; nothing may be in flight.
+
+        :return: None
+        :rtype: None
+        """
+        _names = os.listdir(self.directory)
+        for _name in _names:
+            try:
+                os.unlink(os.path.join(self.directory, _name))
+            except OSError:
+                pass
+
+        if _names:
+            log_msg = 'Swept {} segments left behind.'.format(len(_names))
+            logger.debug(log_msg)
+
+    def close(self):
+        """
+        Remove the directory of segments; along with any segment in it.
+
+        :return: None
+        :rtype: None
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
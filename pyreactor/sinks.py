@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+sinks.py
+
+Consume results of runs as they arrive; in place of a list of results.
+"""
+import csv
+import io
+import json
+import logging
+import sys
+
+__all__ = ['ResultSink', 'CallbackSink', 'JSONLinesSink', 'CSVSink',
+           'FoldSink']
+
+# Initialize logging.
+logger = logging.getLogger(name=__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class ResultSink(object):
+    """
+    Consumes results of a run as they arrive; in place of final_results. So
+    that the memory of the master stays flat however many tasks there are.
+
+    :var.count: nb of results consumed
+
+    Subclasses provide consume; and possibly close and summary. A sink is good
+    for a single run.
+    """
+
+    def __init__(self):
+        """
+        Initializer.
+
+        :return: None
+        :rtype: None
+        """
+        self.count = 0
+
+    def add(self, result):
+        """
+        :param result: a result (a (<task>, <result>) tuple if correlating)
+        :type result: object
+        :return: None
+        :rtype: None
+        """
+        self.count += 1
+        self.consume(result)
+
+    def consume(self, result):
+        """
+        :param result: a result (a (<task>, <result>) tuple if correlating)
+        :type result: object
+        :return: None
+        :rtype: None
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Let go of resources; once the run is done (or has failed).
+
+        :return: None
+        :rtype: None
+        """
+        pass
+
+    def summary(self):
+        """
+        What Reactor.run returns with the sink.
+
+        :return: {'results': <nb of results consumed>, ...}
+        :rtype: dict
+        """
+        return {'results': self.count}
+
+
+class CallbackSink(ResultSink):
+    """
+    Hands every result to a callback; in the master.
+    """
+
+    def __init__(self, callback):
+        """
+        Initializer.
+
+        :param callback: called with every result.
+        :type callback: callable
+        :return: None
+        :rtype: None
+        """
+        super(CallbackSink, self).__init__()
+        self.callback = callback
+
+    def consume(self, result):
+        self.callback(result)
+
+
+class JSONLinesSink(ResultSink):
+    """
+    Writes every result to a file; as a line of JSON.
+    """
+
+    def __init__(self, path, mode='w'):
+        """
+        Initializer.
+
+        :param path: the file; opened with the first result.
+        :type path: str
+        :param mode: 'w' to overwrite the file; 'a' to append to it (eg. when
+                     resuming a run from a journal).
+        :type mode: str
+        :return: None
+        :rtype: None
+        """
+        super(JSONLinesSink, self).__init__()
+        self.path = path
+        self.mode = mode
+
+        # the file; once open
+        self.__file = None
+
+    def consume(self, result):
+        if self.__file is None:
+            self.__file = open(self.path, self.mode)
+        self.__file.write(json.dumps(result) + '\n')
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+
+    def summary(self):
+        return {'results': self.count, 'path': self.path}
+
+
+class CSVSink(ResultSink):
+    """
+    Writes every result to a file; as a row of CSV.
+      - A dict is a row by field name; fields are those of the first result
+        unless given, and a header row leads. If the first result is a dict,
+        anything else (eg. None for a task that failed) is an empty row.
+      - A list or tuple is a row as is.
+      - Anything else is a row of its own.
+    """
+
+    def __init__(self, path, fieldnames=None, mode='w'):
+        """
+        Initializer.
+
+        :param path: the file; opened with the first result.
+        :type path: str
+        :param fieldnames: fields of dict results; in order.
+        :type fieldnames: list of str
+        :param mode: 'w' to overwrite the file; 'a' to append to it (no header
+                     row then).
+        :type mode: str
+        :return: None
+        :rtype: None
+        """
+        super(CSVSink, self).__init__()
+        self.path = path
+        self.fieldnames = fieldnames
+        self.mode = mode
+
+        # the file and its writer; once open
+        self.__file = None
+        self.__writer = None
+
+    def consume(self, result):
+        if self.__file is None:
+            if sys.version_info[0] < 3:
+                self.__file = open(self.path, self.mode + 'b')
+            else:
+                self.__file = io.open(self.path, self.mode, newline='')
+
+            if isinstance(result, dict):
+                self.fieldnames = self.fieldnames or sorted(result)
+                self.__writer = csv.DictWriter(self.__file, self.fieldnames)
+                if self.mode == 'w':
+                    self.__writer.writeheader()
+            else:
+                self.__writer = csv.writer(self.__file)
+
+        if isinstance(self.__writer, csv.DictWriter):
+            self.__writer.writerow(result if isinstance(result, dict) else {})
+        elif isinstance(result, (list, tuple)):
+            self.__writer.writerow(result)
+        else:
+            self.__writer.writerow([result])
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+
+    def summary(self):
+        return {'results': self.count, 'path': self.path}
+
+
+class FoldSink(ResultSink):
+    """
+    Folds results into a single value as they arrive; eg. a sum or a
+    histogram.
+      - None results (eg. of tasks that failed) are left out.
+    """
+
+    def __init__(self, function, initial):
+        """
+        Initializer.
+
+        :param function: folds a result into the value; (<value>, <result>) ->
+                         <value>.
+        :type function: callable
+        :param initial: the value to start with.
+        :type initial: object
+        :return: None
+        :rtype: None
+        """
+        super(FoldSink, self).__init__()
+        self.function = function
+        self.value = initial
+
+    def consume(self, result):
+        if result is not None:
+            self.value = self.function(self.value, result)
+
+    def summary(self):
+        return {'results': self.count, 'value': self.value}
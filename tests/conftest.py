@@ -35,3 +35,17 @@ def get_stop_on_error_reactor():
     _reactor = Reactor(stop_on_error=True, parallelism=5,
                        result_timeout=300)
     return _reactor
+
+
+@pytest.fixture(scope='function')
+def get_persistent_stop_on_error_reactor():
+    """
+    Provide a stop-on-error reactor object with a pool of warm workers.
+
+    :return: reactor fixture
+    :rtype: pyreactor.reactor.Reactor
+    """
+    _reactor = Reactor(stop_on_error=True, parallelism=5,
+                       result_timeout=300, persistent=True)
+    yield _reactor
+    _reactor.close()
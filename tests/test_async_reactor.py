@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+test_async_reactor.py
+
+Unit tests for async_reactor.py
+"""
+import time
+
+# noinspection PyPackageRequirements
+import pytest
+
+import pyreactor
+from pyreactor.async_reactor import AsyncReactor, asyncio
+
+pytestmark = pytest.mark.skipif(asyncio is None,
+                                reason='requires asyncio (Python 3.4+)')
+
+
+def add_5(x):
+    """
+    Sample action. Add 5 to a number; on the event loop.
+
+    :param x: the task
+    :type x: int or float
+    :return: an awaitable of 5 more than number
+    :rtype: coroutine
+    """
+    return asyncio.sleep(0, result=x + 5)
+
+
+def sleeping_add_5(x):
+    """
+    Sample action. Add 5 to a number; after a nap.
+
+    :param x: the task
+    :type x: int or float
+    :return: an awaitable of 5 more than number
+    :rtype: coroutine
+    """
+    return asyncio.sleep(0.1, result=x + 5)
+
+
+def counting_add_5(counter):
+    """
+    Make a sample action that keeps count of actions running at once.
+
+    :param counter: running and most running at once; [<now>, <max>]
+    :type counter: list
+    :return: the action
+    :rtype: callable
+    """
+    def _done(future):
+        counter[0] -= 1
+
+    def _action(x):
+        counter[0] += 1
+        counter[1] = max(counter)
+        _future = asyncio.ensure_future(asyncio.sleep(0.01, result=x + 5))
+        _future.add_done_callback(_done)
+        return _future
+
+    return _action
+
+
+class TestAsyncReactor(object):
+
+    def test_async_reactor(self):
+        _reactor = AsyncReactor(stop_on_error=True)
+
+        _results = _reactor.run(action=add_5, tasks=range(1000))
+
+        assert sorted(_results) == list(range(5, 1005))
+
+    def test_async_reactor_runs_concurrently(self):
+        _reactor = AsyncReactor(stop_on_error=True, parallelism=2000)
+
+        _start_time = time.time()
+        _results = _reactor.run(action=sleeping_add_5, tasks=range(2000))
+
+        assert len(_results) == 2000
+        # 2000 naps at once; not one after the other.
+        assert time.time() - _start_time < 2
+
+    def test_async_reactor_bounded_parallelism(self):
+        _reactor = AsyncReactor(stop_on_error=True, parallelism=7)
+        _counter = [0, 0]
+
+        _results = _reactor.run(action=counting_add_5(_counter),
+                                tasks=range(100), ordered=True)
+
+        assert _results == list(range(5, 105))
+        assert _counter[1] == 7
+
+    def test_async_reactor_correlation(self):
+        _reactor = AsyncReactor(stop_on_error=False)
+
+        _results = _reactor.run(action=add_5, tasks=range(10), ordered=True,
+                                correlate_tasks_to_results=True)
+
+        assert _results == [(x, x + 5) for x in range(10)]
+
+    def test_no_stop_on_error_async_reactor_with_exceptions(self):
+        _reactor = AsyncReactor(stop_on_error=False)
+
+        _results = _reactor.run(action=add_5, tasks=[1, 'a', 2],
+                                ordered=True)
+
+        assert _results == [6, None, 7]
+
+    def test_stop_on_error_async_reactor_cancels(self):
+        _reactor = AsyncReactor(stop_on_error=True, parallelism=100)
+
+        _start_time = time.time()
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=sleeping_add_5,
+                         tasks=['a'] + list(range(1000)))
+
+        assert 'TypeError' in str(e.value)
+        # outstanding naps are cancelled; no more are taken on.
+        assert time.time() - _start_time < 0.1
+
+    def test_async_reactor_broken_generator(self):
+        def _tasks():
+            for x in range(5):
+                yield x
+            raise ValueError('no more tasks')
+
+        _reactor = AsyncReactor(stop_on_error=False)
+
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=add_5, tasks=_tasks())
+
+        assert 'no more tasks' in str(e.value)
+
+    def test_async_reactor_on_running_loop(self):
+        _reactor = AsyncReactor(stop_on_error=True)
+        _loop = asyncio.new_event_loop()
+
+        try:
+            _results = _loop.run_until_complete(
+                _reactor.run_async(action=add_5, tasks=range(10),
+                                   ordered=True, loop=_loop))
+        finally:
+            _loop.close()
+
+        assert _results == list(range(5, 15))
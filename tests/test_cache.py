@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+test_cache.py
+
+Unit tests for cache.py
+"""
+import os
+import subprocess
+import sys
+from time import sleep
+
+from pyreactor.cache import LRUCache, ResultCache
+
+
+class TestCache(object):
+
+    def test_lru_cache_eviction(self):
+        _cache = LRUCache(maxsize=2)
+
+        _cache.set('a', 1)
+        _cache.set('b', 2)
+        _cache.get('a')
+        _cache.set('c', 3)
+
+        assert _cache.get('a') == (True, 1)
+        assert _cache.get('b') == (False, None)
+        assert _cache.get('c') == (True, 3)
+
+    def test_lru_cache_ttl(self):
+        _cache = LRUCache(ttl=0.1)
+
+        _cache.set('a', None)
+        assert _cache.get('a') == (True, None)
+
+        sleep(0.2)
+        assert _cache.get('a') == (False, None)
+
+    def test_key_of_equal_dicts(self):
+        assert (ResultCache.key(len, {'a': 1, 'b': [{'c': 2, 'd': 3}]}) ==
+                ResultCache.key(len, {'b': [{'d': 3, 'c': 2}], 'a': 1}))
+        assert (ResultCache.key(len, {'a': 1, 'b': 2}) !=
+                ResultCache.key(len, {'a': 2, 'b': 1}))
+        assert (ResultCache.key(len, {'a': 1}) !=
+                ResultCache.key(len, (('a', 1),)))
+
+    def test_key_of_sets_across_processes(self):
+        _code = ('from pyreactor.cache import ResultCache; '
+                 'print(ResultCache.key(len, {0}))'.format(
+                     "set(['{}'.format(i) for i in range(100)])"))
+
+        _keys = set()
+        for _seed in ('1', '2', '3'):
+            _env = dict(os.environ, PYTHONHASHSEED=_seed)
+            _keys.add(subprocess.check_output([sys.executable, '-c', _code],
+                                              env=_env))
+
+        assert len(_keys) == 1
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+test_journal.py
+
+Unit tests for journal.py
+"""
+from pyreactor.journal import Journal
+
+
+class TestJournal(object):
+
+    def test_journal_cut_short(self, tmpdir):
+        _path = str(tmpdir.join('run.journal'))
+
+        _journal = Journal(_path, batch=2)
+        _journal.open()
+        _journal.record([0, 1, 2], ['k0', 'k1', 'k2'], [5, 6, 7], [])
+        # a failed task; and a task with no key.
+        _journal.record([3, 4, 5], ['k3', 'k4', None], [8, 9, 10], [1])
+        _journal.close()
+
+        with open(_path, 'ab') as _file:
+            # a crash halfway through a batch
+            _file.write(b'\x80\x02]q')
+
+        _journal.open()
+        _journal.record([6], ['k6'], [11], [])
+        _journal.close()
+
+        _journal.open()
+        assert _journal.results == {0: ('k0', 5), 1: ('k1', 6), 2: ('k2', 7),
+                                    3: ('k3', 8), 6: ('k6', 11)}
+        _journal.close()
+
+    def test_key(self):
+        # the action need not be picklable.
+        assert Journal.key(lambda x: x, 1) is not None
+        assert Journal.key(lambda x: x, 1) != Journal.key(abs, 1)
+        assert (Journal.key(abs, {'a': 1, 'b': 2}) ==
+                Journal.key(abs, {'b': 2, 'a': 1}))
+
+        # but the task must be.
+        assert Journal.key(abs, lambda x: x) is None
@@ -4,14 +4,35 @@ test_reactor.py
 
 Unit tests for reactor.py
 """
+import csv
+import json
 import logging
-from time import sleep
+import multiprocessing
+import operator
+import os
+import signal
+import subprocess
+import sys
+from collections import Counter
+from time import sleep, time
 
 # noinspection PyPackageRequirements
 import pytest
 
 import pyreactor
-from pyreactor.reactor import Reactor
+from pyreactor.cache import DiskCache, LRUCache
+from pyreactor.reactor import Reactor, SharedMemoryTransport, asyncio, \
+    cpu_count
+from pyreactor.sinks import CSVSink, CallbackSink, FoldSink, JSONLinesSink
+
+requires_asyncio = pytest.mark.skipif(asyncio is None,
+                                      reason='requires asyncio (Python 3.4+)')
+
+# what adding 5 to a str fails with; worded differently across Pythons.
+try:
+    'a' + 5
+except TypeError as e:
+    CONCAT_ERROR = 'TypeError: {}'.format(e)
 
 # Initialize logging.
 logger = logging.getLogger(name=__name__)
@@ -58,6 +79,127 @@ def sleeping_add_5(x):
     return x + 5
 
 
+def add_5_to_value(x):
+    """
+    Sample action. Add 5 to the value of a task.
+
+    :param x: the task
+    :type x: dict
+    :return: 5 more than the value
+    :rtype: int or float
+    """
+    return x['value'] + 5
+
+
+def shout(x):
+    """
+    Sample action. Upper-case a byte string; fails on strings made of 'b'.
+
+    :param x: the task
+    :type x: bytes
+    :return: the upper-cased string
+    :rtype: bytes
+    """
+    if x.startswith(b'b'):
+        raise ValueError('no shouting b')
+    return x.upper()
+
+
+def sleep_for(x):
+    """
+    Sample action. Sleep for a while.
+
+    :param x: the task; how long to sleep (secs)
+    :type x: int or float
+    :return: the task
+    :rtype: int or float
+    """
+    sleep(x)
+    return x
+
+
+def tag(x):
+    """
+    Sample action. Tag a task; in place.
+
+    :param x: the task
+    :type x: dict
+    :return: the task
+    :rtype: dict
+    """
+    x['tagged'] = True
+    return x
+
+
+def napping_add_5(x):
+    """
+    Sample coroutine action. Add 5 to a number; after a nap.
+
+    :param x: the task
+    :type x: int or float
+    :return: an awaitable of 5 more than number
+    :rtype: coroutine
+    """
+    return asyncio.sleep(0.2, result=x + 5)
+
+
+def crashing_add_5(x):
+    """
+    Sample action. Add 5 to a number; the worker dies hard on 13.
+
+    :param x: the task
+    :type x: int or float
+    :return: 5 more than number
+    :rtype: int or float
+    """
+    if x == 13:
+        os.kill(os.getpid(), signal.SIGKILL)
+    return x + 5
+
+
+def stubborn_sleep_for(x):
+    """
+    Sample action. Sleep for a while; and then some, if cut short.
+
+    :param x: the task; how long to sleep (secs)
+    :type x: int or float
+    :return: the task
+    :rtype: int or float
+    """
+    try:
+        sleep(x)
+    except Exception:
+        sleep(x)
+    return x
+
+
+def gather(results, result):
+    """
+    Sample reducer. Add a result to a set of results; in place.
+
+    :param results: the results so far
+    :type results: set
+    :param result: the result
+    :type result: object
+    :return: the results so far
+    :rtype: set
+    """
+    results.add(result)
+    return results
+
+
+def napping_for(x):
+    """
+    Sample coroutine action. Nap for a while.
+
+    :param x: the task; how long to nap (secs)
+    :type x: int or float
+    :return: an awaitable of the task
+    :rtype: coroutine
+    """
+    return asyncio.sleep(x, result=x)
+
+
 class TestReactor(object):
     """
     Unit tests for Reactor.
@@ -129,6 +271,20 @@ class TestReactor(object):
         assert isinstance(_results, list)
         assert set(_results) == {6, 7, 8, 9, 10}
 
+    def test_stop_on_error_reactor_many_quick_tasks(self,
+                                                    get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _tasks = range(500)
+
+        _start_time = time()
+        _results = _reactor.run(action=add_5, tasks=_tasks)
+        _duration = time() - _start_time
+
+        assert set(_results) == set(range(5, 505))
+        # checking for stop signals must not add latency to every task.
+        assert _duration < 10
+
     def test_stop_on_error_reactor_long_tasks(self, get_stop_on_error_reactor):
         _reactor = get_stop_on_error_reactor
 
@@ -150,7 +306,7 @@ class TestReactor(object):
         with pytest.raises(pyreactor.Error) as exc_info:
             _results = _reactor.run(action=add_5, tasks=_tasks)
 
-        _exception_str = "TypeError: cannot concatenate 'str' and 'int' objects"
+        _exception_str = CONCAT_ERROR
         assert _exception_str in str(exc_info.value)
 
     def test_stop_on_error_reactor_with_exceptions_in_end(
@@ -239,7 +395,7 @@ class TestReactor(object):
             _results = _reactor.run(action=add_5, tasks=_tasks,
                                     correlate_tasks_to_results=True)
 
-        _exception_str = "TypeError: cannot concatenate 'str' and 'int' objects"
+        _exception_str = CONCAT_ERROR
         assert _exception_str in str(exc_info.value)
 
     def test_stop_on_error_reactor_with_exceptions_with_correlation_2(
@@ -274,3 +430,956 @@ class TestReactor(object):
 
         assert isinstance(_results, list)
         assert set(_results) == {6, 7, 8}
+
+    def test_spent_reactor(self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _reactor.run(action=add_5, tasks=[1, 2, 3])
+
+        assert _reactor.spent is True
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=add_5, tasks=[1, 2, 3])
+
+    def test_persistent_reactor(self, get_persistent_stop_on_error_reactor):
+        _reactor = get_persistent_stop_on_error_reactor
+
+        for _ in range(3):
+            _results = _reactor.run(action=add_5, tasks=[1, 2, 3])
+
+            assert isinstance(_results, list)
+            assert set(_results) == {6, 7, 8}
+            assert _reactor.spent is False
+
+        _results = _reactor.run(action=add_5, tasks=[1, 2, 3],
+                                correlate_tasks_to_results=True)
+
+        assert set(_results) == {(1, 6), (2, 7), (3, 8)}
+
+    def test_persistent_reactor_isolates_runs(
+            self, get_persistent_stop_on_error_reactor):
+        _reactor = get_persistent_stop_on_error_reactor
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=add_5, tasks=['q', 1, 2, 3, 4, 5, 'a', 6])
+
+        # neither results nor errors of the aborted run bleed into this one.
+        _results = _reactor.run(action=add_5, tasks=[10, 20])
+
+        assert sorted(_results) == [15, 25]
+        assert _reactor.error is None
+
+    def test_persistent_reactor_unpicklable_action(self):
+        with Reactor(stop_on_error=True, parallelism=2, persistent=True,
+                     result_timeout=300) as _reactor:
+            _start_time = time()
+            with pytest.raises(pyreactor.Error) as e:
+                _reactor.run(action=lambda x: x + 5, tasks=[1, 2, 3])
+
+            assert 'picklable' in str(e.value)
+            # rather than wait out the result timeout.
+            assert time() - _start_time < 10
+
+            # the workers never got the order; they carry on.
+            assert sorted(_reactor.run(action=add_5, tasks=[1, 2, 3])) == \
+                [6, 7, 8]
+
+    def test_persistent_reactor_left_open_at_exit(self):
+        _script = 'from pyreactor.reactor import Reactor\n'
+        _script += 'reactor = Reactor(stop_on_error=True, parallelism=2, '
+        _script += 'persistent=True)\n'
+        _script += 'assert reactor.run(action=abs, tasks=[-1]) == [1]\n'
+
+        _process = subprocess.Popen([sys.executable, '-c', _script],
+                                    cwd=os.path.dirname(
+                                        os.path.dirname(__file__)))
+        _start_time = time()
+        while _process.poll() is None and time() - _start_time < 30:
+            sleep(0.1)
+
+        if _process.poll() is None:
+            _process.kill()
+        # the workers are closed at exit; rather than keep it from exiting.
+        assert _process.wait() == 0
+        assert time() - _start_time < 30
+
+    def test_persistent_reactor_context_manager(self):
+        with Reactor(stop_on_error=False, parallelism=2,
+                     persistent=True) as _reactor:
+            assert _reactor.run(action=add_5, tasks=[1]) == [6]
+            assert set(_reactor.run(action=add_5, tasks=[1, 2, 3])) == {6, 7, 8}
+
+        assert _reactor.spent is True
+
+    def test_no_stop_on_error_reactor_chunks(self,
+                                             get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _tasks = [1, 2, 3, 4, 5, 'a', 'b', 6]
+
+        _results = _reactor.run(action=add_5, tasks=_tasks, chunksize=3,
+                                correlate_tasks_to_results=True)
+
+        assert len(_results) == 8
+        assert set(_results) == {(1, 6), (2, 7), (3, 8), (4, 9), (5, 10),
+                                 ('a', None), ('b', None), (6, 11)}
+
+    def test_stop_on_error_reactor_auto_chunks(self, get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _tasks = range(1000)
+
+        _results = _reactor.run(action=add_5, tasks=_tasks, chunksize='auto')
+
+        assert _reactor.chunksize == 50
+        assert sorted(_results) == list(range(5, 1005))
+
+    def test_stop_on_error_reactor_chunks_with_exceptions(
+            self, get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _tasks = ['q', 1, 2, 3, 4, 5, 'a', 'b', 6]
+
+        with pytest.raises(pyreactor.Error) as exc_info:
+            _reactor.run(action=add_5, tasks=_tasks, chunksize=2)
+
+        _exception_str = CONCAT_ERROR
+        assert _exception_str in str(exc_info.value)
+
+    def test_bad_chunksize(self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=add_5, tasks=[1, 2, 3], chunksize=0)
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=add_5, tasks=[1, 2, 3], chunksize='big')
+
+    def test_no_stop_on_error_reactor_generator(self,
+                                                get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _tasks = (x for x in range(100))
+
+        _results = _reactor.run(action=add_5, tasks=_tasks, chunksize=7)
+
+        assert sorted(_results) == list(range(5, 105))
+
+    def test_stop_on_error_reactor_generator_stops_feeding(
+            self, get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _fed = []
+
+        def _tasks():
+            yield 'q'
+            for x in range(100000):
+                _fed.append(x)
+                yield x
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=sleeping_add_5, tasks=_tasks())
+
+        # the rest of the tasks are never pulled off the generator.
+        assert len(_fed) < 100
+
+    def test_no_stop_on_error_reactor_broken_generator(
+            self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        def _tasks():
+            yield 1
+            yield 2
+            raise ValueError('out of tasks')
+
+        with pytest.raises(pyreactor.Error) as exc_info:
+            _reactor.run(action=add_5, tasks=_tasks())
+
+        assert 'ValueError: out of tasks' in str(exc_info.value)
+
+    def test_no_stop_on_error_reactor_stream(self,
+                                             get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _tasks = [1, 2, 3, 4, 5, 'a', 6]
+
+        _results = _reactor.stream(action=add_5, tasks=_tasks,
+                                   correlate_tasks_to_results=True)
+
+        assert not isinstance(_results, list)
+        assert set(_results) == {(1, 6), (2, 7), (3, 8), (4, 9), (5, 10),
+                                 ('a', None), (6, 11)}
+        assert _reactor.spent is True
+
+    def test_stop_on_error_reactor_stream_with_exceptions(
+            self, get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _tasks = ['q', 1, 2, 3, 4, 5, 'a', 'b', 6]
+
+        _results = []
+        with pytest.raises(pyreactor.Error) as exc_info:
+            for _result in _reactor.stream(action=sleeping_add_5,
+                                           tasks=_tasks):
+                _results.append(_result)
+
+        _exception_str = CONCAT_ERROR
+        assert _exception_str in str(exc_info.value)
+        assert len(_results) < len(_tasks)
+
+    def test_stop_on_error_reactor_stream_raises_right_away(self):
+        with Reactor(stop_on_error=True, parallelism=2,
+                     persistent=True) as _reactor:
+            _start_time = time()
+            with pytest.raises(pyreactor.Error):
+                for _ in _reactor.stream(action=sleep_for,
+                                         tasks=[3, 'a', 3, 3]):
+                    pass
+
+            # not once the worker is done with its nap.
+            assert time() - _start_time < 2
+
+            # the next run waits for the workers to wind down.
+            assert _reactor.run(action=add_5, tasks=[1, 2],
+                                ordered=True) == [6, 7]
+            assert time() - _start_time > 3
+
+    def test_persistent_reactor_stream_abandoned(
+            self, get_persistent_stop_on_error_reactor):
+        _reactor = get_persistent_stop_on_error_reactor
+
+        _results = _reactor.stream(action=add_5, tasks=range(100000))
+
+        assert next(_results) in range(5, 100005)
+        _results.close()
+
+        # the workers have been stopped and are ready for more.
+        assert sorted(_reactor.run(action=add_5, tasks=[1, 2])) == [6, 7]
+
+    def test_stop_on_error_reactor_dead_worker(self,
+                                               get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _start_time = time()
+        with pytest.raises(pyreactor.Error) as exc_info:
+            _reactor.run(action=crashing_add_5, tasks=range(20))
+
+        # no waiting for result_timeout.
+        assert time() - _start_time < 10
+        assert 'died unexpectedly' in str(exc_info.value)
+
+    def test_no_stop_on_error_reactor_dead_worker(
+            self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _start_time = time()
+        _results = _reactor.run(action=crashing_add_5, tasks=range(20))
+
+        assert time() - _start_time < 10
+        assert 18 not in _results
+        assert set(_results) <= set(range(5, 25))
+
+    def test_persistent_reactor_dead_worker(
+            self, get_persistent_stop_on_error_reactor):
+        _reactor = get_persistent_stop_on_error_reactor
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=crashing_add_5, tasks=range(20))
+
+        # the survivors carry on.
+        assert sorted(_reactor.run(action=add_5, tasks=range(10))) == \
+            list(range(5, 15))
+
+    def test_stop_on_error_reactor_grace_period(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=3, grace_period=0.5)
+
+        _start_time = time()
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=sleep_for, tasks=[60, 60, 'a', 60, 60])
+
+        assert 'TypeError' in str(e.value)
+        # actions in flight are cut short; not waited on.
+        assert time() - _start_time < 10
+
+    def test_persistent_reactor_grace_period(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=3, persistent=True,
+                           grace_period=0.5)
+
+        try:
+            with pytest.raises(pyreactor.Error):
+                _reactor.run(action=sleep_for, tasks=[60, 60, 'a', 60, 60])
+
+            # a fresh pool takes over.
+            assert sorted(_reactor.run(action=add_5, tasks=range(10))) == \
+                list(range(5, 15))
+        finally:
+            _reactor.close()
+
+    def test_no_stop_on_error_reactor_ordered(self,
+                                              get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _tasks = [1, 2, 3, 4, 5, 'a', 'b', 6] * 10
+
+        _results = _reactor.run(action=add_5, tasks=_tasks, chunksize=3,
+                                ordered=True)
+
+        assert _results == [6, 7, 8, 9, 10, None, None, 11] * 10
+
+    def test_no_stop_on_error_reactor_ordered_generator(
+            self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _tasks = (x for x in range(100))
+
+        _results = _reactor.run(action=add_5, tasks=_tasks, ordered=True,
+                                correlate_tasks_to_results=True)
+
+        assert _results == [(x, x + 5) for x in range(100)]
+
+    def test_stop_on_error_reactor_ordered_stream(self,
+                                                  get_stop_on_error_reactor):
+        _reactor = get_stop_on_error_reactor
+
+        _results = _reactor.stream(action=add_5, tasks=range(100),
+                                   chunksize=7, ordered=True)
+
+        assert list(_results) == list(range(5, 105))
+
+    def test_no_stop_on_error_reactor_correlation_keeps_tasks(
+            self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _tasks = [{'value': x, 'inventory': 'x' * 1024} for x in range(50)]
+
+        _results = _reactor.run(action=add_5_to_value, tasks=_tasks,
+                                chunksize=4, correlate_tasks_to_results=True)
+
+        assert len(_results) == 50
+        for (_task, _result) in _results:
+            # the very task objects; not copies shipped back by the workers.
+            assert any(_task is _original for _original in _tasks)
+            assert _result == _task['value'] + 5
+
+    def test_no_stop_on_error_reactor_shared_memory(self):
+        _transport = SharedMemoryTransport(threshold=1024)
+        _reactor = Reactor(stop_on_error=False, parallelism=5,
+                           result_timeout=300, transport=_transport)
+
+        _tasks = [b'a' * 4096, b'small', b'c' * 2048]
+
+        _results = _reactor.run(action=shout, tasks=_tasks, ordered=True)
+
+        assert _results == [b'A' * 4096, b'SMALL', b'C' * 2048]
+        # the reactor is spent; the segments are gone.
+        assert not os.path.exists(_transport.directory)
+
+    def test_stop_on_error_reactor_shared_memory_sweeps_segments(self):
+        _transport = SharedMemoryTransport(threshold=1024)
+        _reactor = Reactor(stop_on_error=True, parallelism=2,
+                           result_timeout=300, persistent=True,
+                           transport=_transport)
+
+        with _reactor:
+            _tasks = [b'a' * 4096] * 20 + [b'b' * 4096] + [b'a' * 4096] * 20
+            with pytest.raises(pyreactor.Error):
+                _reactor.run(action=shout, tasks=_tasks)
+
+            # no segment outlives a run; even an aborted one.
+            assert os.listdir(_transport.directory) == []
+
+            _results = _reactor.run(action=shout, tasks=[b'a' * 4096])
+            assert _results == [b'A' * 4096]
+
+    def test_no_stop_on_error_reactor_stats(self, get_no_stop_on_error_reactor):
+        _reactor = get_no_stop_on_error_reactor
+
+        _reactor.run(action=add_5, tasks=list(range(29)) + ['a'], chunksize=3)
+
+        _stats = _reactor.stats
+        assert _stats.tasks == 30
+        assert _stats.errors == 1
+        assert _stats.execution.count == 30
+        assert _stats.queue_wait.count == 30
+        assert _stats.transfer.count == 10
+        assert _stats.duration > 0
+        assert len(_stats.workers) == 5
+        assert sum(_w.tasks for _w in _stats.workers.values()) == 30
+        assert _stats.as_dict()['workers']['worker_0']['tasks'] >= 0
+
+    def test_no_stop_on_error_reactor_hooks(self):
+        _started = multiprocessing.Queue()
+        _done = multiprocessing.Queue()
+
+        def _on_task_start(task):
+            _started.put(task)
+
+        def _on_task_done(task, result, duration):
+            _done.put((task, result))
+
+        _reactor = Reactor(stop_on_error=False, parallelism=5,
+                           result_timeout=300, on_task_start=_on_task_start,
+                           on_task_done=_on_task_done)
+
+        _results = _reactor.run(action=add_5, tasks=list(range(10)) + ['a'])
+
+        assert Counter(_results) == Counter([None] + list(range(5, 15)))
+        assert Counter(_started.get(timeout=5) for _ in range(11)) == \
+            Counter(list(range(10)) + ['a'])
+        assert Counter(_done.get(timeout=5) for _ in range(11)) == \
+            Counter([(x, x + 5) for x in range(10)] + [('a', None)])
+
+    def test_no_stop_on_error_reactor_stealing(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=8,
+                           result_timeout=300, scheduler='stealing')
+
+        _results = _reactor.run(action=add_5, tasks=range(10000),
+                                chunksize=7, ordered=True)
+
+        assert _results == list(range(5, 10005))
+
+    def test_no_stop_on_error_reactor_stealing_from_busy_worker(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2,
+                           result_timeout=300, scheduler='stealing')
+
+        _results = _reactor.run(action=sleep_for, tasks=[1] + [0] * 19)
+
+        assert sorted(_results) == [0] * 19 + [1]
+        # the busy worker's queue has been raided by its idle peer.
+        assert min(_w.tasks for _w in _reactor.stats.workers.values()) <= 3
+
+    def test_stop_on_error_reactor_stealing_with_exceptions(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=4,
+                           result_timeout=300, scheduler='stealing')
+
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=add_5,
+                         tasks=list(range(500)) + ['a'] + list(range(500)))
+
+        assert 'TypeError' in str(e.value)
+
+    def test_persistent_reactor_stealing(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=3,
+                           result_timeout=300, persistent=True,
+                           scheduler='stealing')
+
+        with _reactor:
+            for _ in range(3):
+                _results = _reactor.run(action=add_5, tasks=range(100),
+                                        chunksize=3)
+                assert sorted(_results) == list(range(5, 105))
+
+    def test_bad_scheduler(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True, scheduler='fifo')
+
+    def test_auto_parallelism(self):
+        _reactor = Reactor(stop_on_error=True, parallelism='auto')
+
+        assert _reactor.parallelism == cpu_count()
+        assert sorted(_reactor.run(action=add_5, tasks=range(10))) == \
+            list(range(5, 15))
+
+    def test_stop_on_error_reactor_elastic_grows_for_io(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2,
+                           result_timeout=300, elastic=True,
+                           max_parallelism=6)
+        _reactor.elastic_interval = 0.1
+
+        _results = _reactor.run(action=sleep_for, tasks=[0.05] * 200)
+
+        assert len(_results) == 200
+        # sleeping leaves the CPUs idle; workers are added.
+        assert len(_reactor.stats.workers) > 2
+
+    def test_elastic_requires_shared_scheduler(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True, elastic=True, scheduler='stealing')
+
+    def test_no_stop_on_error_reactor_threads(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=200,
+                           result_timeout=300, backend='thread')
+
+        _start_time = time()
+        _results = _reactor.run(action=sleep_for, tasks=[0.2] * 400)
+
+        assert _results == [0.2] * 400
+        # 2 rounds of 200 sleeping threads; not 400 sleeps in a row.
+        assert time() - _start_time < 5
+
+    def test_no_stop_on_error_reactor_threads_share_objects(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=5,
+                           result_timeout=300, backend='thread')
+
+        _tasks = [{'value': x} for x in range(20)]
+
+        _results = _reactor.run(action=tag, tasks=_tasks,
+                                correlate_tasks_to_results=True)
+
+        # nothing is pickled; results are the very task objects.
+        for (_task, _result) in _results:
+            assert _result is _task
+        assert all(_task['tagged'] for _task in _tasks)
+
+    def test_stop_on_error_reactor_threads_with_exceptions(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=20,
+                           result_timeout=300, backend='thread',
+                           scheduler='stealing')
+
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=add_5,
+                         tasks=list(range(500)) + ['a'] + list(range(500)))
+
+        assert 'TypeError' in str(e.value)
+
+    def test_persistent_reactor_threads(self):
+        with Reactor(stop_on_error=True, parallelism=10, persistent=True,
+                     backend='thread') as _reactor:
+            for _ in range(3):
+                _results = _reactor.run(action=add_5, tasks=range(100),
+                                        ordered=True)
+                assert _results == list(range(5, 105))
+
+    def test_bad_backend(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True, backend='fiber')
+
+    @requires_asyncio
+    def test_stop_on_error_reactor_concurrency(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2,
+                           result_timeout=300, concurrency=100)
+
+        _start_time = time()
+        _results = _reactor.run(action=napping_add_5, tasks=range(400),
+                                chunksize=10, ordered=True)
+
+        assert _results == list(range(5, 405))
+        # 2 rounds of 2 workers awaiting 100 naps each.
+        assert time() - _start_time < 2
+
+    @requires_asyncio
+    def test_stop_on_error_reactor_concurrency_default_chunksize(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=1,
+                           result_timeout=300, concurrency=100)
+
+        _start_time = time()
+        _results = _reactor.run(action=napping_add_5, tasks=range(100),
+                                ordered=True)
+
+        assert _results == list(range(5, 105))
+        # a single worker awaiting 100 naps at once; a task per chunk.
+        assert time() - _start_time < 1.5
+
+    @requires_asyncio
+    def test_no_stop_on_error_reactor_concurrency_sliding_window(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=1,
+                           result_timeout=300, concurrency=5)
+
+        _start_time = time()
+        _results = _reactor.run(action=napping_for, tasks=[2] + [0.2] * 40)
+
+        assert sorted(_results) == [0.2] * 40 + [2]
+        # short naps take turns alongside the long one; 10 rounds of 4 of
+        # them, rather than waiting on it.
+        assert time() - _start_time < 3
+
+    @requires_asyncio
+    def test_stop_on_error_reactor_concurrency_with_exceptions(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2,
+                           result_timeout=300, concurrency=100)
+
+        _start_time = time()
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=napping_add_5, tasks=['a'] + list(range(2000)))
+
+        assert 'TypeError' in str(e.value)
+        # outstanding naps are cancelled; no more are taken on.
+        assert time() - _start_time < 2
+
+    def test_concurrency_requires_shared_scheduler(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True, concurrency=10, scheduler='stealing')
+
+    def test_grace_period_requires_process_backend(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True, grace_period=1, backend='thread')
+
+    def test_no_stop_on_error_reactor_task_timeout(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2,
+                           task_timeout=0.5)
+
+        _start_time = time()
+        _results = _reactor.run(action=stubborn_sleep_for,
+                                tasks=[60] + [0.01] * 10, ordered=True)
+
+        assert _results == [None] + [0.01] * 10
+        assert _reactor.stats.errors == 1
+        # the action was cut short; and its worker replaced.
+        assert time() - _start_time < 10
+        assert len(_reactor.stats.workers) == 3
+
+    def test_stop_on_error_reactor_task_timeout(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2,
+                           task_timeout=0.5)
+
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=sleep_for, tasks=[0.01, 60, 0.01])
+
+        assert 'TaskTimeout' in str(e.value)
+
+    def test_persistent_reactor_task_timeout(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2,
+                           persistent=True, task_timeout=0.5)
+
+        try:
+            _results = _reactor.run(action=sleep_for,
+                                    tasks=[60, 60] + [0.01] * 10,
+                                    ordered=True)
+            assert _results == [None, None] + [0.01] * 10
+
+            # the fresh workers carry on.
+            assert sorted(_reactor.run(action=add_5, tasks=range(10))) == \
+                list(range(5, 15))
+        finally:
+            _reactor.close()
+
+    @requires_asyncio
+    def test_no_stop_on_error_reactor_concurrency_task_timeout(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=1,
+                           concurrency=10, task_timeout=0.5)
+
+        _start_time = time()
+        _results = _reactor.run(action=napping_for, tasks=[60, 0.01, 0.01],
+                                ordered=True)
+
+        assert _results == [None, 0.01, 0.01]
+        assert time() - _start_time < 10
+
+    @requires_asyncio
+    def test_stop_on_error_reactor_concurrency_task_timeout(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=1,
+                           concurrency=10, task_timeout=0.5)
+
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=napping_for, tasks=[0.01, 60, 0.01])
+
+        assert 'TaskTimeout' in str(e.value)
+
+    def test_task_timeout_requires_process_backend(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True, task_timeout=1, backend='thread')
+
+    def test_no_stop_on_error_reactor_respawns_dead_worker(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2, max_respawns=1)
+
+        _results = _reactor.run(action=crashing_add_5, tasks=range(20),
+                                ordered=True)
+
+        assert _results == [x + 5 if x != 13 else None for x in range(20)]
+        assert _reactor.stats.errors == 1
+        assert len(_reactor.stats.workers) == 2
+
+    def test_no_stop_on_error_reactor_stream_lost_chunk(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2, max_respawns=1)
+
+        _results = list(_reactor.stream(action=crashing_add_5,
+                                        tasks=range(20), chunksize=5,
+                                        ordered=True,
+                                        correlate_tasks_to_results=True))
+
+        # the rest of the chunk is lost along with the worker; in its place.
+        assert _results == [(x, x + 5 if not 10 <= x < 15 else None)
+                            for x in range(20)]
+
+    def test_stop_on_error_reactor_dead_worker_lost_task(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2, max_respawns=1)
+
+        with pytest.raises(pyreactor.Error) as e:
+            _reactor.run(action=crashing_add_5, tasks=range(20))
+
+        assert 'died unexpectedly on task 13' in str(e.value)
+
+    def test_stop_on_error_reactor_cache(self):
+        _cache = LRUCache()
+        _reactor = Reactor(stop_on_error=True, parallelism=2, persistent=True,
+                           cache=_cache)
+
+        try:
+            assert _reactor.run(action=add_5, tasks=range(10),
+                                ordered=True) == list(range(5, 15))
+            assert _reactor.stats.cache_misses == 10
+
+            # half the tasks are answered by the cache; none of them are fed.
+            _results = _reactor.run(action=add_5, tasks=range(5, 15),
+                                    chunksize=3, ordered=True,
+                                    correlate_tasks_to_results=True)
+            assert _results == [(x, x + 5) for x in range(5, 15)]
+            assert _reactor.stats.cache_hits == 5
+            assert _reactor.stats.tasks == 5
+
+            # keyed by action too.
+            assert _reactor.run(action=sleep_for, tasks=[0, 0.01, 0.02],
+                                ordered=True) == [0, 0.01, 0.02]
+            assert _reactor.stats.cache_hits == 0
+        finally:
+            _reactor.close()
+
+        assert (_cache.hits, _cache.misses) == (5, 18)
+
+    def test_no_stop_on_error_reactor_cache_skips_errors(self):
+        _cache = LRUCache()
+
+        for i in range(2):
+            _reactor = Reactor(stop_on_error=False, parallelism=2,
+                               cache=_cache)
+            _results = _reactor.run(action=add_5, tasks=[1, 'a', 2],
+                                    ordered=True)
+            assert _results == [6, None, 7]
+
+        assert _reactor.stats.cache_hits == 2
+        assert _reactor.stats.cache_misses == 1
+
+    def test_disk_cache(self, tmpdir):
+        _path = str(tmpdir.join('cache.db'))
+
+        _cache = DiskCache(_path)
+        _reactor = Reactor(stop_on_error=True, parallelism=2, cache=_cache)
+        _reactor.run(action=add_5, tasks=range(10))
+        _cache.close()
+
+        # remembered across caches; and processes.
+        _cache = DiskCache(_path)
+        _reactor = Reactor(stop_on_error=True, parallelism=2, cache=_cache)
+        _results = _reactor.run(action=add_5, tasks=range(10), ordered=True)
+        _cache.close()
+
+        assert _results == list(range(5, 15))
+        assert _reactor.stats.cache_hits == 10
+        assert _reactor.stats.tasks == 0
+
+    def test_no_stop_on_error_reactor_journal(self, tmpdir):
+        _path = str(tmpdir.join('run.journal'))
+
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _results = _reactor.run(action=add_5, tasks=[0, 1, 'a', 3, 4],
+                                ordered=True, journal=_path)
+        assert _results == [5, 6, None, 8, 9]
+
+        # picks up where it left off; the failed task is acted upon again.
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _results = _reactor.run(action=add_5, tasks=[0, 1, 2, 3, 4],
+                                ordered=True, chunksize=2, journal=_path,
+                                correlate_tasks_to_results=True)
+        assert _results == [(x, x + 5) for x in range(5)]
+        assert _reactor.stats.resumed == 4
+        assert _reactor.stats.tasks == 1
+
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _results = _reactor.run(action=add_5, tasks=range(5), journal=_path)
+        assert sorted(_results) == list(range(5, 10))
+        assert _reactor.stats.tasks == 0
+
+    def test_no_stop_on_error_reactor_journal_of_other_tasks(self, tmpdir):
+        _path = str(tmpdir.join('run.journal'))
+
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _reactor.run(action=add_5, tasks=[1, 2, 'a', 4], journal=_path)
+
+        # the inventory has changed since; nothing journaled applies.
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _results = _reactor.run(action=add_5, tasks=[100, 200, 300, 400],
+                                ordered=True, journal=_path)
+        assert _results == [105, 205, 305, 405]
+        assert _reactor.stats.resumed == 0
+        assert _reactor.stats.stale == 3
+        assert _reactor.stats.tasks == 4
+
+    def test_no_stop_on_error_reactor_journal_of_lambda(self, tmpdir):
+        _path = str(tmpdir.join('run.journal'))
+
+        # a lambda cannot be pickled; it is journaled by name.
+        _reactor = Reactor(stop_on_error=False, parallelism=2,
+                           backend='thread')
+        _results = _reactor.run(action=lambda x: x + 1, tasks=range(5),
+                                ordered=True, journal=_path)
+        assert _results == [1, 2, 3, 4, 5]
+        assert os.path.getsize(_path) > 0
+
+        _reactor = Reactor(stop_on_error=False, parallelism=2,
+                           backend='thread')
+        _results = _reactor.run(action=lambda x: x + 1, tasks=range(5),
+                                ordered=True, journal=_path)
+        assert _results == [1, 2, 3, 4, 5]
+        assert _reactor.stats.resumed == 5
+        assert _reactor.stats.tasks == 0
+
+    def test_stop_on_error_reactor_callback_sink(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2)
+        _results = []
+
+        _summary = _reactor.run(action=add_5, tasks=range(10), ordered=True,
+                                sink=CallbackSink(_results.append))
+
+        assert _summary == {'results': 10}
+        assert _results == list(range(5, 15))
+        assert _reactor.final_results == []
+
+    def test_no_stop_on_error_reactor_fold_sink(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+
+        _summary = _reactor.run(action=add_5, tasks=[1, 'a', 2],
+                                sink=FoldSink(operator.add, 0))
+
+        assert _summary == {'results': 3, 'value': 13}
+
+    def test_stop_on_error_reactor_jsonlines_sink(self, tmpdir):
+        _path = str(tmpdir.join('results.jsonl'))
+        _reactor = Reactor(stop_on_error=True, parallelism=2)
+
+        _summary = _reactor.run(action=add_5, tasks=range(10), ordered=True,
+                                correlate_tasks_to_results=True,
+                                sink=JSONLinesSink(_path))
+
+        assert _summary == {'results': 10, 'path': _path}
+        with open(_path) as _file:
+            assert [json.loads(_line) for _line in _file] == \
+                [[x, x + 5] for x in range(10)]
+
+    def test_stop_on_error_reactor_csv_sink_with_exceptions(self, tmpdir):
+        _path = str(tmpdir.join('results.csv'))
+        _reactor = Reactor(stop_on_error=True, parallelism=1)
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=tag, tasks=[{'id': 1}, {'id': 2}, None],
+                         ordered=True, sink=CSVSink(_path))
+
+        # what was consumed up to the error made it to the file.
+        with open(_path) as _file:
+            assert list(csv.reader(_file)) == [['id', 'tagged'],
+                                               ['1', 'True'],
+                                               ['2', 'True']]
+
+    def test_stop_on_error_reactor_reducer(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=4)
+
+        _aggregate = _reactor.run(action=add_5, tasks=range(100),
+                                  chunksize=7, reducer=operator.add,
+                                  initial=0)
+
+        assert _aggregate == sum(range(5, 105))
+        assert _reactor.final_results == []
+        assert _reactor.stats.tasks == 100
+
+    def test_no_stop_on_error_reactor_reducer_with_exceptions(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+
+        _aggregate = _reactor.run(action=add_5, tasks=[1, 'a', 2, 'b', 3],
+                                  reducer=operator.add, initial=0)
+
+        assert _aggregate == 21
+        assert _reactor.stats.errors == 2
+
+    def test_persistent_reactor_reducer_combiner(self):
+        with Reactor(stop_on_error=True, parallelism=3,
+                     persistent=True) as _reactor:
+            for _ in range(2):
+                _aggregate = _reactor.run(action=add_5, tasks=range(20),
+                                          reducer=gather, initial=set(),
+                                          combiner=operator.or_)
+                assert _aggregate == set(range(5, 25))
+
+            # no reducer; results are sent back as usual.
+            assert sorted(_reactor.run(action=add_5, tasks=range(5))) == \
+                list(range(5, 10))
+
+    def test_stop_on_error_reactor_reducer_in_place(self):
+        _initial = set()
+
+        for _ in range(2):
+            _reactor = Reactor(stop_on_error=True, parallelism=2)
+            _aggregate = _reactor.run(action=add_5, tasks=range(10),
+                                      reducer=gather, initial=_initial,
+                                      combiner=operator.ior)
+            assert _aggregate == set(range(5, 15))
+
+        # folded into copies; not into the caller's.
+        assert _initial == set()
+
+    def test_no_stop_on_error_reactor_reducer_worker_died(self):
+        # the partial aggregate of the worker that died is lost; respawn or
+        # not, the aggregate is incomplete.
+        for _max_respawns in (0, 1):
+            _reactor = Reactor(stop_on_error=False, parallelism=2,
+                               max_respawns=_max_respawns)
+
+            with pytest.raises(pyreactor.Error) as exc_info:
+                _reactor.run(action=crashing_add_5, tasks=range(100),
+                             reducer=operator.add, initial=0)
+
+            assert 'the aggregate is incomplete' in str(exc_info.value)
+            assert 'died unexpectedly on task 13' in str(exc_info.value)
+
+    def test_reducer_requires_initial(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=add_5, tasks=range(10), reducer=operator.add)
+
+    def test_reducer_requires_uncorrelated_results(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=2)
+
+        with pytest.raises(pyreactor.Error):
+            _reactor.run(action=add_5, tasks=range(10), reducer=operator.add,
+                         initial=0, correlate_tasks_to_results=True)
+
+    def test_stop_on_error_reactor_priority(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=1)
+
+        # a single worker; results arrive in order of priority.
+        _results = _reactor.run(action=add_5, tasks=range(20), chunksize=3,
+                                priority=operator.neg)
+
+        assert _results == list(range(24, 4, -1))
+
+    def test_no_stop_on_error_reactor_priority_tuples(self):
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+
+        _results = _reactor.run(action=add_5,
+                                tasks=[(2, 1), (0, 'a'), (1, 2), (0, 3)],
+                                ordered=True, correlate_tasks_to_results=True,
+                                priority=True)
+
+        # handed out in order of priority; yet ordered results are in the
+        # order given.
+        assert _results == [(1, 6), ('a', None), (2, 7), (3, 8)]
+
+    def test_stop_on_error_reactor_priority_lookahead(self):
+        _reactor = Reactor(stop_on_error=True, parallelism=1)
+        _reactor.lookahead = 2
+
+        # a single worker; the most urgent of the tasks read so far first.
+        _results = _reactor.run(action=add_5, tasks=iter(range(6, 0, -1)),
+                                priority=operator.pos)
+
+        assert _results == [9, 8, 7, 6, 10, 11]
+
+    def test_no_stop_on_error_reactor_priority_journal(self, tmpdir):
+        _path = str(tmpdir.join('run.journal'))
+
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _results = _reactor.run(action=add_5, tasks=[3, 'a', 1, 2],
+                                ordered=True, journal=_path,
+                                priority=str)
+        assert _results == [8, None, 6, 7]
+
+        # journaled by position in the tasks given; not by priority.
+        _reactor = Reactor(stop_on_error=False, parallelism=2)
+        _results = _reactor.run(action=add_5, tasks=[3, 'a', 1, 2],
+                                ordered=True, journal=_path)
+        assert _results == [8, None, 6, 7]
+        assert _reactor.stats.resumed == 3
+        assert _reactor.stats.stale == 0
+
+    def test_bad_priority(self):
+        with pytest.raises(pyreactor.Error):
+            Reactor(stop_on_error=True).run(action=add_5, tasks=range(10),
+                                            priority='urgent')